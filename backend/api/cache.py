@@ -0,0 +1,109 @@
+from threading import Lock, local
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import CacheGeneration
+
+RECIPE_FRAGMENT_KEY = "recipe-fragment:{}:{}"
+
+_state = local()
+
+
+def start_generation_scope():
+    _state.scoped = True
+    _state.generations = None
+
+
+def end_generation_scope():
+    _state.scoped = False
+    _state.generations = None
+
+
+def get_generations():
+    generations = getattr(_state, "generations", None)
+    if generations is None:
+        generations = dict(
+            CacheGeneration.objects.values_list("namespace", "value")
+        )
+        if getattr(_state, "scoped", False):
+            _state.generations = generations
+    return generations
+
+
+def bump_generations(namespaces):
+    namespaces = sorted(set(namespaces))
+    if namespaces:
+        transaction.on_commit(lambda: _bump_generations(namespaces))
+
+
+def _bump_generations(namespaces):
+    CacheGeneration.objects.bulk_create(
+        [CacheGeneration(namespace=namespace) for namespace in namespaces],
+        ignore_conflicts=True,
+    )
+    CacheGeneration.objects.filter(namespace__in=namespaces).update(
+        value=F("value") + 1
+    )
+    _state.generations = None
+
+
+class LocalCache:
+    def __init__(self, namespace, max_entries=1000):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._generation = None
+        self._data = {}
+
+    def get(self, key, build):
+        generation = get_generations().get(self.namespace, 0)
+        with self._lock:
+            if generation != self._generation:
+                self._data.clear()
+                self._generation = generation
+            if key in self._data:
+                return self._data[key]
+
+        value = build()
+        with self._lock:
+            if generation == self._generation:
+                if len(self._data) >= self.max_entries:
+                    self._data.clear()
+                self._data[key] = value
+        return value
+
+
+def get_recipe_fragments(recipes, render):
+    fragment_keys = {
+        recipe.id: RECIPE_FRAGMENT_KEY.format(
+            recipe.id, recipe.updated_at.isoformat()
+        )
+        for recipe in recipes
+    }
+    cached = cache.get_many(fragment_keys.values())
+
+    fragments = {}
+    missing = []
+    for recipe in recipes:
+        key = fragment_keys[recipe.id]
+        if key in cached:
+            fragments[recipe.id] = cached[key]
+        else:
+            missing.append(recipe)
+
+    if missing:
+        rendered = dict(
+            zip((recipe.id for recipe in missing), render(missing))
+        )
+        cache.set_many(
+            {
+                fragment_keys[recipe_id]: fragment
+                for recipe_id, fragment in rendered.items()
+            },
+            settings.RECIPE_CACHE_TIMEOUT,
+        )
+        fragments.update(rendered)
+    return fragments
@@ -0,0 +1,90 @@
+import atexit
+import logging
+from collections import Counter
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import Case, F, Value, When
+
+from recipes.models import Recipe
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    def __init__(self, model, field, flush_interval, flush_size):
+        self.model = model
+        self.field = field
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._lock = Lock()
+        self._pending = Counter()
+        self._flushed_at = monotonic()
+
+    def increment(self, object_id, amount=1):
+        with self._lock:
+            self._pending[object_id] += amount
+            due = (
+                len(self._pending) >= self.flush_size
+                or monotonic() - self._flushed_at >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def pending(self, object_id):
+        return self._pending.get(object_id, 0)
+
+    def discard(self):
+        with self._lock:
+            self._pending.clear()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._flushed_at = monotonic()
+        if not pending:
+            return
+        try:
+            self.write(pending)
+        except DatabaseError:
+            logger.exception("Не удалось сохранить счётчики %s", self.field)
+            with self._lock:
+                self._pending.update(pending)
+
+    def write(self, pending):
+        if connection.vendor == "postgresql":
+            table = connection.ops.quote_name(self.model._meta.db_table)
+            column = connection.ops.quote_name(self.field)
+            values = ", ".join(["(%s, %s)"] * len(pending))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table} "
+                    f"SET {column} = {table}.{column} + v.amount "
+                    f"FROM (VALUES {values}) AS v(id, amount) "
+                    f"WHERE {table}.id = v.id",
+                    [value for item in pending.items() for value in item],
+                )
+            return
+        self.model.objects.filter(id__in=pending).update(
+            **{
+                self.field: F(self.field)
+                + Case(
+                    *[
+                        When(id=object_id, then=Value(amount))
+                        for object_id, amount in pending.items()
+                    ],
+                    default=Value(0),
+                )
+            }
+        )
+
+
+recipe_views = CounterBuffer(
+    Recipe,
+    "views",
+    flush_interval=settings.VIEW_COUNTER_FLUSH_INTERVAL,
+    flush_size=settings.VIEW_COUNTER_FLUSH_SIZE,
+)
+atexit.register(recipe_views.flush)
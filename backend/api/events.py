@@ -0,0 +1,232 @@
+import asyncio
+import json
+import logging
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import Max
+from rest_framework.authtoken.models import Token
+
+from recipes.models import Recipe
+from users.models import Following
+
+logger = logging.getLogger(__name__)
+
+EVENT_FIELDS = ("id", "name", "author_id", "cooking_time", "image")
+
+
+def get_user_id(key):
+    return (
+        Token.objects.filter(key=key, user__is_active=True)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+
+
+def get_followed_ids(user_id):
+    return set(
+        Following.objects.filter(follower_id=user_id).values_list(
+            "following_id", flat=True
+        )
+    )
+
+
+def get_last_recipe_id():
+    return Recipe.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+
+
+def get_new_recipes(since, limit, author_ids=None):
+    queryset = Recipe.objects.filter(id__gt=since)
+    if author_ids is not None:
+        queryset = queryset.filter(author_id__in=author_ids)
+    return list(queryset.order_by("id").values(*EVENT_FIELDS)[:limit])
+
+
+def format_event(recipe):
+    data = {
+        "id": recipe["id"],
+        "name": recipe["name"],
+        "author": recipe["author_id"],
+        "cooking_time": recipe["cooking_time"],
+        "image": settings.MEDIA_URL + recipe["image"],
+    }
+    return (
+        f"id: {recipe['id']}\n"
+        "event: recipe\n"
+        f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    ).encode()
+
+
+class Subscription:
+    def __init__(self, author_ids):
+        self.author_ids = author_ids
+        self.queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        self.overflowed = False
+
+    def put(self, recipe):
+        try:
+            self.queue.put_nowait(recipe)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class RecipeEventHub:
+    def __init__(self):
+        self._subscriptions = {}
+        self._poller = None
+
+    def subscribe(self, author_ids):
+        subscription = Subscription(author_ids)
+        for author_id in author_ids:
+            self._subscriptions.setdefault(author_id, set()).add(
+                subscription
+            )
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self.poll())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        for author_id in subscription.author_ids:
+            subscriptions = self._subscriptions.get(author_id)
+            if subscriptions is None:
+                continue
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[author_id]
+
+    def publish(self, recipe):
+        for subscription in self._subscriptions.get(recipe["author_id"], ()):
+            subscription.put(recipe)
+
+    async def poll(self):
+        last_id = await sync_to_async(get_last_recipe_id)()
+        while True:
+            await asyncio.sleep(settings.EVENTS_POLL_INTERVAL)
+            try:
+                recipes = await sync_to_async(get_new_recipes)(
+                    last_id, settings.EVENTS_BATCH_SIZE
+                )
+            except DatabaseError:
+                logger.exception("Не удалось получить новые рецепты")
+                await sync_to_async(connection.close)()
+                continue
+            for recipe in recipes:
+                last_id = recipe["id"]
+                self.publish(recipe)
+
+
+hub = RecipeEventHub()
+
+
+def get_token(scope):
+    headers = dict(scope["headers"])
+    authorization = headers.get(b"authorization", b"").decode()
+    keyword, _, key = authorization.partition(" ")
+    if keyword == "Token" and key:
+        return key
+    query = parse_qs(scope["query_string"].decode())
+    return query.get("token", [None])[0]
+
+
+def get_last_event_id(scope):
+    headers = dict(scope["headers"])
+    try:
+        return int(headers.get(b"last-event-id", b""))
+    except ValueError:
+        return None
+
+
+async def wait_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def send_error(send, status, detail):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send(
+        {
+            "type": "http.response.body",
+            "body": json.dumps(
+                {"detail": detail}, ensure_ascii=False
+            ).encode(),
+        }
+    )
+
+
+async def recipe_events(scope, receive, send):
+    key = get_token(scope)
+    user_id = key and await sync_to_async(get_user_id)(key)
+    if not user_id:
+        await send_error(send, 401, "Учетные данные не были предоставлены.")
+        return
+    author_ids = await sync_to_async(get_followed_ids)(user_id)
+
+    subscription = hub.subscribe(author_ids)
+    disconnect = asyncio.ensure_future(wait_disconnect(receive))
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        await send_chunk(send, f"retry: {settings.EVENTS_RETRY}\n\n".encode())
+
+        last_id = get_last_event_id(scope)
+        if last_id is not None and author_ids:
+            last_id = await catch_up(send, last_id, author_ids)
+        await stream(send, subscription, disconnect, last_id or 0)
+    finally:
+        hub.unsubscribe(subscription)
+        disconnect.cancel()
+
+
+async def catch_up(send, last_id, author_ids):
+    while True:
+        recipes = await sync_to_async(get_new_recipes)(
+            last_id, settings.EVENTS_BATCH_SIZE, author_ids
+        )
+        for recipe in recipes:
+            await send_chunk(send, format_event(recipe))
+            last_id = recipe["id"]
+        if len(recipes) < settings.EVENTS_BATCH_SIZE:
+            return last_id
+
+
+async def stream(send, subscription, disconnect, last_id):
+    while not subscription.overflowed:
+        get = asyncio.ensure_future(subscription.queue.get())
+        done, _ = await asyncio.wait(
+            (get, disconnect),
+            timeout=settings.EVENTS_HEARTBEAT_INTERVAL,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if disconnect in done:
+            get.cancel()
+            return
+        if get not in done:
+            get.cancel()
+            await send_chunk(send, b": ping\n\n")
+            continue
+        recipe = get.result()
+        if recipe["id"] > last_id:
+            await send_chunk(send, format_event(recipe))
+            last_id = recipe["id"]
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def send_chunk(send, body):
+    await send({"type": "http.response.body", "body": body, "more_body": True})
@@ -1,5 +1,8 @@
+from django.conf import settings
+from django.db.models import Case, When
 from django_filters.rest_framework import FilterSet, filters
 
+from .search import ingredient_index
 from recipes.models import Ingredient, Recipe, Tag
 
 
@@ -11,6 +14,10 @@ class IngredientFilter(FilterSet):
         fields = ["name"]
 
 
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    pass
+
+
 class RecipeFilter(FilterSet):
     tags = filters.ModelMultipleChoiceFilter(
         field_name="tags__slug",
@@ -21,6 +28,7 @@ class RecipeFilter(FilterSet):
     is_in_shopping_cart = filters.BooleanFilter(
         method="filter_is_in_shopping_cart"
     )
+    ingredients = NumberInFilter(method="filter_ingredients")
 
     class Meta:
         model = Recipe
@@ -29,6 +37,7 @@ class RecipeFilter(FilterSet):
             "author",
             "is_favorited",
             "is_in_shopping_cart",
+            "ingredients",
         )
 
     def filter_is_favorited(self, queryset, name, value):
@@ -42,3 +51,19 @@ class RecipeFilter(FilterSet):
         if value and user.is_authenticated:
             return queryset.filter(shopping_cart__user=self.request.user)
         return queryset
+
+    def filter_ingredients(self, queryset, name, value):
+        recipe_ids = ingredient_index.search(
+            [int(ingredient_id) for ingredient_id in value],
+            limit=settings.INGREDIENT_SEARCH_LIMIT,
+        )
+        if not recipe_ids:
+            return queryset.none()
+        return queryset.filter(id__in=recipe_ids).order_by(
+            Case(
+                *[
+                    When(id=recipe_id, then=position)
+                    for position, recipe_id in enumerate(recipe_ids)
+                ]
+            )
+        )
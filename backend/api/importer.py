@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from drf_extra_fields.fields import Base64ImageField
+from rest_framework.exceptions import ValidationError
+
+from .serializers import RecipeImportSerializer
+from .signals import change_counter, invalidate_recipes
+from recipes.models import Ingredient, IngredientInRecipe, Recipe, Tag
+from recipes.storage import recipe_image_storage
+
+
+def store_image(data):
+    image = Base64ImageField().to_internal_value(data)
+    return recipe_image_storage.save(f"recipes/{image.name}", image)
+
+
+class RecipeImporter:
+    def __init__(self, author, batch_size=None, workers=None, limit=None):
+        self.author = author
+        self.batch_size = batch_size or settings.RECIPE_IMPORT_BATCH_SIZE
+        self.workers = workers or settings.RECIPE_IMPORT_WORKERS
+        self.limit = limit
+
+    def run(self, data):
+        if not isinstance(data, list) or not data:
+            raise ValidationError("Ожидается непустой список рецептов.")
+        if self.limit is not None and len(data) > self.limit:
+            raise ValidationError(
+                f"За один раз можно загрузить не больше {self.limit} рецептов."
+            )
+        serializer = RecipeImportSerializer(data=data, many=True)
+        serializer.is_valid(raise_exception=True)
+        recipes = serializer.validated_data
+        self.check_references(recipes)
+        images = self.store_images(recipes)
+        return self.create(recipes, images)
+
+    def check_references(self, recipes):
+        ingredient_ids = {
+            ingredient["ingredient"]["id"]
+            for recipe in recipes
+            for ingredient in recipe["ingredients"]
+        }
+        tag_ids = {tag for recipe in recipes for tag in recipe["tags"]}
+        existing_ingredients = set(
+            Ingredient.objects.filter(id__in=ingredient_ids).values_list(
+                "id", flat=True
+            )
+        )
+        existing_tags = set(
+            Tag.objects.filter(id__in=tag_ids).values_list("id", flat=True)
+        )
+
+        errors = []
+        for recipe in recipes:
+            error = {}
+            if any(
+                ingredient["ingredient"]["id"] not in existing_ingredients
+                for ingredient in recipe["ingredients"]
+            ):
+                error["ingredients"] = ["Ингредиент не найден!"]
+            if any(tag not in existing_tags for tag in recipe["tags"]):
+                error["tags"] = ["Тег не найден!"]
+            errors.append(error)
+        if any(errors):
+            raise ValidationError(errors)
+
+    def store_images(self, recipes):
+        with ThreadPoolExecutor(self.workers) as executor:
+            futures = [
+                executor.submit(store_image, recipe["image"])
+                for recipe in recipes
+            ]
+        images = []
+        errors = []
+        for future in futures:
+            try:
+                images.append(future.result())
+                errors.append({})
+            except ValidationError as error:
+                images.append(None)
+                errors.append({"image": error.detail})
+        if any(errors):
+            raise ValidationError(errors)
+        return images
+
+    @transaction.atomic
+    def create(self, recipes, images):
+        created = Recipe.objects.bulk_create(
+            [
+                Recipe(
+                    author=self.author,
+                    name=recipe["name"],
+                    text=recipe["text"],
+                    cooking_time=recipe["cooking_time"],
+                    image=image,
+                )
+                for recipe, image in zip(recipes, images)
+            ],
+            batch_size=self.batch_size,
+        )
+        Recipe.tags.through.objects.bulk_create(
+            [
+                Recipe.tags.through(recipe_id=instance.id, tag_id=tag)
+                for instance, recipe in zip(created, recipes)
+                for tag in recipe["tags"]
+            ],
+            batch_size=self.batch_size,
+        )
+        IngredientInRecipe.objects.bulk_create(
+            [
+                IngredientInRecipe(
+                    recipe_id=instance.id,
+                    ingredient_id=ingredient["ingredient"]["id"],
+                    amount=ingredient["amount"],
+                )
+                for instance, recipe in zip(created, recipes)
+                for ingredient in recipe["ingredients"]
+            ],
+            batch_size=self.batch_size,
+        )
+        change_counter(self.author.id, "recipes_count", len(created))
+        invalidate_recipes(
+            [instance.id for instance in created], touch=False
+        )
+        return created
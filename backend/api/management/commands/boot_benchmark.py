@@ -0,0 +1,137 @@
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+MODES = {"cold": "false", "warm": "true"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Запускает gunicorn в холодном и прогретом режимах и сравнивает "
+        "время до первого ответа и память воркеров"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--port", type=int, default=8099)
+        parser.add_argument("--workers", type=int, default=3)
+        parser.add_argument("--runs", type=int, default=3)
+        parser.add_argument("--requests", type=int, default=20)
+        parser.add_argument("--timeout", type=float, default=60)
+        parser.add_argument("--path", default="/api/tags/")
+        parser.add_argument(
+            "--modes", default="cold,warm", help="Режимы: cold, warm"
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.exists("/proc/self/status"):
+            raise CommandError("Для замера памяти нужен /proc (Linux)")
+        modes = options["modes"].split(",")
+        for mode in modes:
+            if mode not in MODES:
+                raise CommandError(f"Неизвестный режим: {mode}")
+
+        self.stdout.write(
+            f"{'режим':<8}{'запуск, с':>11}{'1-й запрос, мс':>16}"
+            f"{'медиана, мс':>13}{'RSS, МБ':>10}{'PSS, МБ':>10}"
+        )
+        for mode in modes:
+            results = [self.run(mode, options) for _ in range(options["runs"])]
+            self.stdout.write(
+                f"{mode:<8}"
+                f"{self.median(results, 'boot'):>11.2f}"
+                f"{self.median(results, 'first'):>16.1f}"
+                f"{self.median(results, 'latency'):>13.1f}"
+                f"{self.median(results, 'rss'):>10.1f}"
+                f"{self.median(results, 'pss'):>10.1f}"
+            )
+
+    def median(self, results, key):
+        return statistics.median(result[key] for result in results)
+
+    def run(self, mode, options):
+        url = f"http://127.0.0.1:{options['port']}{options['path']}"
+        host = settings.ALLOWED_HOSTS[0]
+        environment = dict(
+            os.environ,
+            GUNICORN_WARM_BOOT=MODES[mode],
+            GUNICORN_BIND=f"127.0.0.1:{options['port']}",
+            GUNICORN_WORKERS=str(options["workers"]),
+        )
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "gunicorn",
+                "foodgram.wsgi:application",
+                "-c",
+                "gunicorn.conf.py",
+            ],
+            cwd=settings.BASE_DIR,
+            env=environment,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            first = self.wait_first_response(
+                process, url, host, started, options["timeout"]
+            )
+            boot = time.perf_counter() - started
+            latencies = [
+                self.fetch(url, host) for _ in range(options["requests"])
+            ]
+            workers = self.get_children(process.pid)
+            memory = [self.read_memory(pid) for pid in workers]
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait(options["timeout"])
+        if not memory:
+            raise CommandError("Не удалось найти процессы воркеров")
+        return {
+            "boot": boot,
+            "first": first,
+            "latency": statistics.median(latencies),
+            "rss": statistics.mean(rss for rss, _ in memory),
+            "pss": statistics.mean(pss for _, pss in memory),
+        }
+
+    def wait_first_response(self, process, url, host, started, timeout):
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise CommandError("gunicorn завершился при запуске")
+            try:
+                return self.fetch(url, host)
+            except OSError:
+                time.sleep(0.01)
+        raise CommandError("gunicorn не ответил за отведённое время")
+
+    def fetch(self, url, host):
+        request = urllib.request.Request(url, headers={"Host": host})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+        except urllib.error.HTTPError as error:
+            raise CommandError(f"{url}: ответ {error.code}")
+        return (time.perf_counter() - started) * 1000
+
+    def get_children(self, pid):
+        with open(f"/proc/{pid}/task/{pid}/children") as file:
+            return [int(child) for child in file.read().split()]
+
+    def read_memory(self, pid):
+        values = {}
+        with open(f"/proc/{pid}/smaps_rollup") as file:
+            for line in file:
+                name, _, value = line.partition(":")
+                if name in ("Rss", "Pss"):
+                    values[name] = int(value.split()[0]) / 1024
+        return values["Rss"], values["Pss"]
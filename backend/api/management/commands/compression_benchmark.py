@@ -0,0 +1,89 @@
+import gzip
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.test import APIClient
+
+from api.counters import recipe_views
+from recipes.models import Recipe
+from users.models import User
+
+ENDPOINTS = (
+    ("recipes", "/api/recipes/?limit=6", False),
+    ("recipes-100", "/api/recipes/?limit=100", False),
+    ("recipe", "/api/recipes/{recipe}/", False),
+    ("ingredients", "/api/ingredients/", False),
+    ("tags", "/api/tags/", False),
+    ("users", "/api/users/?limit=50", True),
+    ("subscriptions", "/api/users/subscriptions/?limit=50", True),
+    ("shopping-list", "/api/recipes/download_shopping_cart/", True),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает затраты процессора на сжатие ответов API "
+        "с количеством сэкономленных байтов"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--levels", default="1,6,9", help="Уровни сжатия gzip"
+        )
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("endpoints", nargs="*")
+
+    def handle(self, *args, **options):
+        levels = [int(level) for level in options["levels"].split(",")]
+        if any(level not in range(1, 10) for level in levels):
+            raise CommandError("Уровень сжатия должен быть от 1 до 9")
+        viewer = (
+            User.objects.annotate(follows=Count("follower"))
+            .order_by("-follows")
+            .first()
+        )
+        if viewer is None:
+            raise CommandError("Сначала заполните базу: seed_recipes")
+        recipe = Recipe.objects.values_list("id", flat=True).first()
+        anonymous = APIClient(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        authenticated = APIClient(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        authenticated.force_authenticate(viewer)
+
+        self.stdout.write(
+            f"{'эндпоинт':<16}{'уровень':>8}{'байт':>10}{'сжато':>10}"
+            f"{'доля':>7}{'мс/ответ':>10}{'мкс/КБ':>9}"
+        )
+        for name, path, personal in ENDPOINTS:
+            if options["endpoints"] and name not in options["endpoints"]:
+                continue
+            client = authenticated if personal else anonymous
+            response = client.get(path.format(recipe=recipe))
+            if response.status_code != 200:
+                self.stdout.write(
+                    self.style.WARNING(f"{name}: ответ {response.status_code}")
+                )
+                continue
+            for level in levels:
+                self.write_row(name, response.content, level, options)
+        recipe_views.discard()
+
+    def write_row(self, name, content, level, options):
+        started = time.process_time()
+        for _ in range(options["repeat"]):
+            compressed = gzip.compress(content, compresslevel=level, mtime=0)
+        elapsed = (time.process_time() - started) / options["repeat"]
+        saved = max(len(content) - len(compressed), 0)
+        per_kilobyte = elapsed * 1e6 / (saved / 1024) if saved else 0
+        style = self.style.WARNING
+        if len(content) >= settings.COMPRESSION_MIN_SIZE:
+            style = str
+        self.stdout.write(
+            style(
+                f"{name:<16}{level:>8}{len(content):>10}"
+                f"{len(compressed):>10}"
+                f"{len(compressed) / len(content):>7.0%}"
+                f"{elapsed * 1000:>10.3f}{per_kilobyte:>9.1f}"
+            )
+        )
@@ -0,0 +1,198 @@
+import json
+import re
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from api.counters import recipe_views
+from recipes.models import Ingredient, Recipe, Tag
+from users.models import User
+
+ENDPOINTS = (
+    ("recipes", "/api/recipes/?limit=6", False),
+    ("recipes-author", "/api/recipes/?author={author}&limit=6", False),
+    ("recipes-tags", "/api/recipes/?tags={tag}&limit=6", False),
+    ("recipes-favorited", "/api/recipes/?is_favorited=1&limit=6", True),
+    ("recipes-cart", "/api/recipes/?is_in_shopping_cart=1&limit=6", True),
+    ("recipes-ingredients", "/api/recipes/?ingredients={ingredient}", False),
+    ("recipes-ids", "/api/recipes/?ids={recipe}", True),
+    ("recipe", "/api/recipes/{recipe}/", True),
+    ("recipe-similar", "/api/recipes/{recipe}/similar/", False),
+    ("recipes-facets", "/api/recipes/facets/", False),
+    ("recipes-trending", "/api/recipes/trending/", False),
+    ("shopping-list", "/api/recipes/download_shopping_cart/", True),
+    ("users", "/api/users/?limit=6", True),
+    ("user", "/api/users/{author}/", True),
+    ("subscriptions", "/api/users/subscriptions/?limit=6", True),
+    ("ingredients", "/api/ingredients/?name={ingredient_name}", False),
+    ("tags", "/api/tags/", False),
+)
+DUMMY_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    "compressed": {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+    },
+}
+SQLITE_FLAGS = re.compile(r"^SCAN \w+$|USE TEMP B-TREE")
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет EXPLAIN для запросов, которые делают эндпоинты API, "
+        "и сравнивает планы с сохранённым базовым вариантом"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Выполнить запросы (EXPLAIN ANALYZE, только PostgreSQL)",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=int,
+            default=1000,
+            help="Порог строк для Seq Scan и Sort в PostgreSQL",
+        )
+        parser.add_argument("--baseline", help="Файл с базовыми планами")
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Перезаписать базовые планы текущими",
+        )
+        parser.add_argument("endpoints", nargs="*")
+
+    def handle(self, *args, **options):
+        self.analyze = options["analyze"]
+        self.threshold = options["threshold"]
+        baseline = {}
+        if options["baseline"] and not options["update_baseline"]:
+            with open(options["baseline"], encoding="utf-8") as file:
+                baseline = json.load(file)
+
+        plans = {}
+        warnings = 0
+        for name, queries in self.capture(options["endpoints"]):
+            plans[name] = []
+            for sql in queries:
+                summary, flags = self.explain(sql)
+                plans[name].append(summary)
+                for flag in flags:
+                    warnings += 1
+                    self.stdout.write(self.style.WARNING(f"{name}: {flag}"))
+            self.stdout.write(f"{name}: запросов {len(queries)}")
+            if name in baseline and baseline[name] != plans[name]:
+                self.stdout.write(
+                    self.style.ERROR(f"{name}: план изменился")
+                )
+                self.write_diff(baseline[name], plans[name])
+
+        if options["baseline"] and options["update_baseline"]:
+            with open(options["baseline"], "w", encoding="utf-8") as file:
+                json.dump(plans, file, ensure_ascii=False, indent=2)
+        self.stdout.write(f"Предупреждений: {warnings}")
+
+    def get_parameters(self):
+        ingredient = (
+            Ingredient.objects.annotate(uses=Count("ingredientinrecipe"))
+            .order_by("-uses")
+            .first()
+        )
+        author = (
+            User.objects.annotate(recipes=Count("recipe"))
+            .order_by("-recipes")
+            .first()
+        )
+        recipe = Recipe.objects.values_list("id", flat=True).first()
+        if ingredient is None or author is None or recipe is None:
+            raise CommandError("Сначала заполните базу: seed_recipes")
+        return {
+            "author": author.id,
+            "tag": Tag.objects.values_list("slug", flat=True).first(),
+            "ingredient": ingredient.id,
+            "ingredient_name": ingredient.name[:3],
+            "recipe": recipe,
+        }
+
+    def get_viewer(self):
+        return (
+            User.objects.annotate(cart=Count("shopping_cart"))
+            .order_by("-cart")
+            .first()
+        )
+
+    def capture(self, names):
+        parameters = self.get_parameters()
+        anonymous = APIClient(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        authenticated = APIClient(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        authenticated.force_authenticate(self.get_viewer())
+
+        for name, path, personal in ENDPOINTS:
+            if names and name not in names:
+                continue
+            client = authenticated if personal else anonymous
+            with override_settings(CACHES=DUMMY_CACHES):
+                yield name, self.run(client, path.format(**parameters))
+        recipe_views.discard()
+
+    def run(self, client, path):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as context:
+                client.get(path)
+            transaction.set_rollback(True)
+        return [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].lstrip().upper().startswith("SELECT")
+        ]
+
+    def explain(self, sql):
+        if connection.vendor == "postgresql":
+            return self.explain_postgresql(sql)
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            details = [row[-1] for row in cursor.fetchall()]
+        return details, [
+            detail for detail in details if SQLITE_FLAGS.search(detail)
+        ]
+
+    def explain_postgresql(self, sql):
+        options = "FORMAT JSON"
+        if self.analyze:
+            options += ", ANALYZE, BUFFERS"
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN ({options}) {sql}")
+            plan = cursor.fetchone()[0][0]["Plan"]
+        summary = []
+        flags = []
+        self.walk(plan, summary, flags)
+        return summary, flags
+
+    def walk(self, node, summary, flags):
+        description = node["Node Type"]
+        if "Index Name" in node:
+            description += f" using {node['Index Name']}"
+        if "Relation Name" in node:
+            description += f" on {node['Relation Name']}"
+        summary.append(description)
+        rows = node.get("Actual Rows", node.get("Plan Rows", 0))
+        if (
+            node["Node Type"] in ("Seq Scan", "Sort")
+            and rows >= self.threshold
+        ):
+            flags.append(f"{description}, строк: {rows}")
+        for child in node.get("Plans", ()):
+            self.walk(child, summary, flags)
+
+    def write_diff(self, before, after):
+        for number in range(max(len(before), len(after))):
+            old = before[number] if number < len(before) else None
+            new = after[number] if number < len(after) else None
+            if old != new:
+                self.stdout.write(f"  запрос {number + 1}:")
+                self.stdout.write(f"    было:  {old}")
+                self.stdout.write(f"    стало: {new}")
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from api.importer import RecipeImporter
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Загружает рецепты из JSON-файлов от имени автора"
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+", type=Path)
+        parser.add_argument(
+            "--author", required=True, help="Имя пользователя или email"
+        )
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument("--workers", type=int)
+
+    def handle(self, *args, **options):
+        author = User.objects.filter(
+            Q(username=options["author"]) | Q(email=options["author"])
+        ).first()
+        if author is None:
+            raise CommandError(f"Пользователь {options['author']} не найден")
+        importer = RecipeImporter(
+            author, options["batch_size"], options["workers"]
+        )
+
+        for path in options["files"]:
+            try:
+                with open(path, encoding="utf-8") as file:
+                    data = json.load(file)
+            except (OSError, ValueError) as error:
+                raise CommandError(f"{path}: {error}")
+            try:
+                recipes = importer.run(data)
+            except ValidationError as error:
+                self.write_errors(path, error.detail)
+                raise CommandError(f"{path}: рецепты не загружены")
+            self.stdout.write(f"{path}: загружено рецептов {len(recipes)}")
+
+    def write_errors(self, path, detail):
+        if not isinstance(detail, list) or not all(
+            isinstance(item, dict) for item in detail
+        ):
+            self.stderr.write(f"{path}: {detail}")
+            return
+        for number, errors in enumerate(detail):
+            for field, messages in errors.items():
+                self.stderr.write(
+                    f"{path}[{number}].{field}: "
+                    + " ".join(map(str, messages))
+                )
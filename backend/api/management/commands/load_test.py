@@ -0,0 +1,264 @@
+import asyncio
+import base64
+import io
+import json
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+from django.core.management import BaseCommand, CommandError
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from recipes.models import Ingredient, Recipe, Tag
+from users.models import User
+
+DEFAULT_MIX = "browse=70,toggle=20,cart=7,create=3"
+
+
+class HttpClient:
+    def __init__(self, base_url, timeout):
+        url = urlsplit(base_url)
+        if url.scheme != "http":
+            raise CommandError("Поддерживается только http://")
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.timeout = timeout
+
+    async def request(self, method, path, token=None, data=None):
+        body = b"" if data is None else json.dumps(data).encode()
+        headers = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}",
+            "Connection: close",
+            "Accept: application/json",
+            f"Content-Length: {len(body)}",
+        ]
+        if data is not None:
+            headers.append("Content-Type: application/json")
+        if token is not None:
+            headers.append(f"Authorization: Token {token}")
+        request = ("\r\n".join(headers) + "\r\n\r\n").encode() + body
+        return await asyncio.wait_for(self.send(request), self.timeout)
+
+    async def send(self, request):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(request)
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        return status, body
+
+
+class Scenarios:
+    def __init__(self, client, tokens, recipe_ids, tag_slugs, catalogue):
+        self.client = client
+        self.tokens = tokens
+        self.recipe_ids = recipe_ids
+        self.tag_slugs = tag_slugs
+        self.catalogue = catalogue
+        self.image = self.make_image()
+
+    def make_image(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (64, 64), "green").save(buffer, "PNG")
+        encoded = base64.b64encode(buffer.getvalue()).decode()
+        return f"data:image/png;base64,{encoded}"
+
+    async def browse(self, call):
+        page = random.randint(1, 10)
+        await call("GET", f"/api/recipes/?page={page}&limit=6")
+        if self.tag_slugs:
+            slug = random.choice(self.tag_slugs)
+            await call("GET", f"/api/recipes/?tags={slug}&limit=6")
+        recipe_id = random.choice(self.recipe_ids)
+        await call("GET", f"/api/recipes/{recipe_id}/", "/api/recipes/{id}/")
+        await call("GET", "/api/tags/")
+
+    async def toggle(self, call):
+        token = random.choice(self.tokens)
+        recipe_id = random.choice(self.recipe_ids)
+        action = random.choice(("favorite", "shopping_cart"))
+        path = f"/api/recipes/{recipe_id}/{action}/"
+        label = f"/api/recipes/{{id}}/{action}/"
+        await call("POST", path, label, token=token)
+        await call("DELETE", path, label, token=token)
+
+    async def cart(self, call):
+        token = random.choice(self.tokens)
+        await call("GET", "/api/recipes/download_shopping_cart/", token=token)
+
+    async def create(self, call):
+        token = random.choice(self.tokens)
+        data = {
+            "name": "Нагрузочный рецепт",
+            "text": "Создан командой load_test",
+            "cooking_time": random.randint(1, 120),
+            "tags": self.catalogue["tags"][:1],
+            "ingredients": [
+                {"id": ingredient_id, "amount": random.randint(1, 100)}
+                for ingredient_id in random.sample(
+                    self.catalogue["ingredients"],
+                    min(3, len(self.catalogue["ingredients"])),
+                )
+            ],
+            "image": self.image,
+        }
+        status, body = await call(
+            "POST", "/api/recipes/", token=token, data=data
+        )
+        if status == 201:
+            recipe_id = json.loads(body)["id"]
+            await call(
+                "DELETE",
+                f"/api/recipes/{recipe_id}/",
+                "/api/recipes/{id}/",
+                token=token,
+            )
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагружает запущенный сервер смесью запросов к API "
+        "и выводит задержки по эндпоинтам"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://localhost:8000")
+        parser.add_argument("--rps", type=float, default=20)
+        parser.add_argument("--duration", type=float, default=30)
+        parser.add_argument("--concurrency", type=int, default=100)
+        parser.add_argument("--timeout", type=float, default=30)
+        parser.add_argument(
+            "--mix",
+            default=DEFAULT_MIX,
+            help=f"Доли сценариев, по умолчанию {DEFAULT_MIX}",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=20,
+            help="Сколько пользователей выполняют авторизованные сценарии",
+        )
+        parser.add_argument("--output", help="Сохранить отчёт в JSON")
+
+    def handle(self, *args, **options):
+        mix = self.parse_mix(options["mix"])
+        scenarios = Scenarios(
+            HttpClient(options["url"], options["timeout"]),
+            self.get_tokens(options["users"]),
+            list(Recipe.objects.values_list("id", flat=True)[:1000]),
+            list(Tag.objects.values_list("slug", flat=True)),
+            {
+                "tags": list(Tag.objects.values_list("id", flat=True)),
+                "ingredients": list(
+                    Ingredient.objects.values_list("id", flat=True)[:1000]
+                ),
+            },
+        )
+        if not scenarios.recipe_ids or not scenarios.tokens:
+            raise CommandError("Сначала заполните базу: seed_recipes")
+
+        samples, elapsed = asyncio.run(self.run(scenarios, mix, options))
+        report = self.make_report(samples, elapsed)
+        self.write_report(report)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    def parse_mix(self, value):
+        mix = {}
+        for item in value.split(","):
+            name, _, weight = item.partition("=")
+            if name not in ("browse", "toggle", "cart", "create"):
+                raise CommandError(f"Неизвестный сценарий: {name}")
+            mix[name] = float(weight)
+        return mix
+
+    def get_tokens(self, count):
+        users = User.objects.filter(is_active=True).order_by("id")[:count]
+        return [
+            Token.objects.get_or_create(user=user)[0].key for user in users
+        ]
+
+    async def run(self, scenarios, mix, options):
+        samples = defaultdict(list)
+        semaphore = asyncio.Semaphore(options["concurrency"])
+
+        async def call(method, path, label=None, token=None, data=None):
+            label = f"{method} {label or path.split('?')[0]}"
+            started = time.perf_counter()
+            try:
+                status, body = await scenarios.client.request(
+                    method, path, token, data
+                )
+            except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                status, body = None, b""
+            samples[label].append((time.perf_counter() - started, status))
+            return status, body
+
+        async def user_session(name):
+            async with semaphore:
+                await getattr(scenarios, name)(call)
+
+        names, weights = list(mix), list(mix.values())
+        interval = 1 / options["rps"]
+        started = time.perf_counter()
+        tasks = set()
+        sessions = 0
+        while time.perf_counter() - started < options["duration"]:
+            name = random.choices(names, weights)[0]
+            task = asyncio.create_task(user_session(name))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            sessions += 1
+            delay = started + sessions * interval - time.perf_counter()
+            await asyncio.sleep(max(delay, 0))
+        if tasks:
+            await asyncio.wait(tasks)
+        return samples, time.perf_counter() - started
+
+    def make_report(self, samples, elapsed):
+        report = {}
+        for label, results in sorted(samples.items()):
+            latencies = sorted(duration * 1000 for duration, _ in results)
+            errors = sum(
+                1 for _, status in results if status is None or status >= 500
+            )
+            report[label] = {
+                "requests": len(results),
+                "errors": errors,
+                "error_rate": errors / len(results),
+                "throughput": len(results) / elapsed,
+                "p50": self.percentile(latencies, 50),
+                "p95": self.percentile(latencies, 95),
+                "p99": self.percentile(latencies, 99),
+                "max": latencies[-1],
+                "statuses": Counter(str(status) for _, status in results),
+            }
+        return report
+
+    def percentile(self, values, percent):
+        if len(values) == 1:
+            return values[0]
+        return statistics.quantiles(values, n=100, method="inclusive")[
+            percent - 1
+        ]
+
+    def write_report(self, report):
+        self.stdout.write(
+            f"{'эндпоинт':<48}{'запросов':>9}{'ошибки':>8}{'в сек':>8}"
+            f"{'p50':>9}{'p95':>9}{'p99':>9}"
+        )
+        for label, row in report.items():
+            self.stdout.write(
+                f"{label:<48}{row['requests']:>9}"
+                f"{row['error_rate']:>8.1%}{row['throughput']:>8.1f}"
+                f"{row['p50']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}"
+            )
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from api.publisher import publish_landing_pages
+
+
+class Command(BaseCommand):
+    help = "Публикует первые страницы списка рецептов в PRERENDER_ROOT"
+
+    def handle(self, *args, **options):
+        if not settings.PRERENDER_ROOT:
+            raise CommandError("PRERENDER_ROOT не задан")
+        published = publish_landing_pages()
+        self.stdout.write(f"Опубликовано страниц: {len(published)}")
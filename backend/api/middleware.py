@@ -0,0 +1,165 @@
+import cProfile
+import gzip
+from hashlib import md5
+from pathlib import Path
+from random import random
+from threading import Lock
+from time import monotonic, perf_counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.middleware.gzip import re_accepts_gzip
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+
+from .cache import end_generation_scope, start_generation_scope
+
+
+class CacheGenerationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start_generation_scope()
+        try:
+            return self.get_response(request)
+        finally:
+            end_generation_scope()
+
+
+def compress_body(content):
+    return gzip.compress(
+        content, compresslevel=settings.COMPRESSION_LEVEL, mtime=0
+    )
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            not request.path.startswith(settings.COMPRESSION_PATH_PREFIX)
+            or response.streaming
+            or not self.is_compressible(response)
+        ):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if (
+            response.status_code != 200
+            or response.has_header("Content-Encoding")
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE
+            or not re_accepts_gzip.search(
+                request.META.get("HTTP_ACCEPT_ENCODING", "")
+            )
+        ):
+            return response
+
+        if self.is_public(request, response):
+            compressed = self.get_compressed(response.content)
+        else:
+            compressed = compress_body(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = "gzip"
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
+
+    def is_compressible(self, response):
+        content_type = response.get("Content-Type", "").split(";")[0]
+        return content_type in settings.COMPRESSION_CONTENT_TYPES
+
+    def is_public(self, request, response):
+        return "HTTP_AUTHORIZATION" not in request.META and (
+            "private" not in response.get("Cache-Control", "")
+        )
+
+    def get_compressed(self, content):
+        cache = caches[settings.COMPRESSION_CACHE_ALIAS]
+        key = "compressed:{}:{}".format(
+            settings.COMPRESSION_LEVEL,
+            md5(content, usedforsecurity=False).hexdigest(),
+        )
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = compress_body(content)
+            cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+        return compressed
+
+
+class RateLimitHeadersMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        for header, value in getattr(request, "rate_limit", {}).items():
+            response[header] = value
+        return response
+
+
+class SlowRequestProfilerMiddleware:
+    lock = Lock()
+    saved_at = None
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        view_name = self.get_view_name(request)
+        if view_name is None:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        started = perf_counter()
+        try:
+            return profiler.runcall(self.get_response, request)
+        finally:
+            elapsed = perf_counter() - started
+            if elapsed >= settings.PROFILE_THRESHOLD and self.acquire_slot():
+                self.save(profiler, view_name, elapsed)
+
+    def get_view_name(self, request):
+        if not settings.PROFILE_DIR:
+            return None
+        if random() >= settings.PROFILE_SAMPLE_RATE:
+            return None
+        try:
+            view_name = resolve(request.path_info).view_name
+        except Resolver404:
+            return None
+        if view_name not in settings.PROFILE_VIEW_NAMES:
+            return None
+        return view_name
+
+    def acquire_slot(self):
+        cls = type(self)
+        with cls.lock:
+            now = monotonic()
+            if (
+                cls.saved_at is not None
+                and now - cls.saved_at < settings.PROFILE_MIN_INTERVAL
+            ):
+                return False
+            cls.saved_at = now
+            return True
+
+    def save(self, profiler, view_name, elapsed):
+        directory = Path(settings.PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = "{}-{}-{}ms.prof".format(
+            timezone.now().strftime("%Y%m%d-%H%M%S"),
+            view_name.split(":")[-1],
+            int(elapsed * 1000),
+        )
+        profiler.dump_stats(directory / name)
+
+        profiles = sorted(directory.glob("*.prof"))
+        for path in profiles[: -settings.PROFILE_MAX_FILES]:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class CacheGeneration(models.Model):
+    namespace = models.CharField(
+        "Пространство имён", unique=True, max_length=50
+    )
+    value = models.BigIntegerField("Поколение", default=0)
+
+    class Meta:
+        verbose_name = "Поколение кэша"
+        verbose_name_plural = "Поколения кэша"
+
+    def __str__(self):
+        return f"{self.namespace}: {self.value}"
@@ -0,0 +1,87 @@
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock, Timer
+
+from django.conf import settings
+from django.db import connection
+from django.test import RequestFactory
+
+from .middleware import compress_body
+from recipes.models import Tag
+
+_lock = Lock()
+_timer = None
+
+
+def get_landing_queries():
+    queries = list(settings.PRERENDER_QUERIES)
+    for slug in Tag.objects.values_list("slug", flat=True):
+        queries.extend(
+            query.format(slug=slug) for query in settings.PRERENDER_TAG_QUERIES
+        )
+    return queries
+
+
+def get_page_name(query):
+    return f"index?{query}.json" if query else "index.json"
+
+
+def write_atomic(path, content):
+    with NamedTemporaryFile(dir=path.parent, delete=False) as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    os.chmod(file.name, 0o644)
+    os.replace(file.name, path)
+
+
+def publish_landing_pages():
+    from .views import RecipeViewSet
+
+    directory = Path(settings.PRERENDER_ROOT) / "recipes"
+    directory.mkdir(parents=True, exist_ok=True)
+    view = RecipeViewSet.as_view({"get": "list"}, throttle_classes=[])
+    factory = RequestFactory(
+        SERVER_NAME=settings.PRERENDER_HOST,
+        HTTP_HOST=settings.PRERENDER_HOST,
+    )
+
+    published = set()
+    for query in get_landing_queries():
+        response = view(factory.get(f"/api/recipes/?{query}"))
+        if response.status_code != 200:
+            continue
+        response.render()
+        name = get_page_name(query)
+        write_atomic(directory / name, response.content)
+        write_atomic(
+            directory / f"{name}.gz", compress_body(response.content)
+        )
+        published.add(name)
+
+    for path in directory.glob("index*.json*"):
+        if path.name.removesuffix(".gz") not in published:
+            path.unlink(missing_ok=True)
+    return published
+
+
+def _publish_scheduled():
+    global _timer
+    with _lock:
+        _timer = None
+    try:
+        publish_landing_pages()
+    finally:
+        connection.close()
+
+
+def schedule_publish():
+    global _timer
+    if not settings.PRERENDER_ROOT:
+        return
+    with _lock:
+        if _timer is None:
+            _timer = Timer(settings.PRERENDER_DELAY, _publish_scheduled)
+            _timer.daemon = True
+            _timer.start()
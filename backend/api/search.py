@@ -0,0 +1,85 @@
+from collections import Counter
+from datetime import timedelta
+from threading import Lock
+
+from django.db.models import Max
+
+from .cache import get_generations
+from recipes.models import IngredientInRecipe, Recipe
+
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+
+class IngredientIndex:
+    def __init__(self):
+        self._lock = Lock()
+        self._generation = None
+        self._watermark = None
+        self._postings = {}
+        self._recipes = {}
+
+    def search(self, ingredient_ids, limit=None):
+        generation = get_generations().get("recipes", 0)
+        with self._lock:
+            if generation != self._generation:
+                self._refresh()
+                self._generation = generation
+            matches = Counter()
+            for ingredient_id in set(ingredient_ids):
+                matches.update(self._postings.get(ingredient_id, ()))
+            sizes = {
+                recipe_id: len(self._recipes[recipe_id])
+                for recipe_id in matches
+            }
+
+        ranked = sorted(
+            matches.items(),
+            key=lambda item: (
+                -item[1] / sizes[item[0]],
+                sizes[item[0]] - item[1],
+                -item[0],
+            ),
+        )
+        return [recipe_id for recipe_id, _ in ranked[:limit]]
+
+    def _refresh(self):
+        watermark = Recipe.objects.aggregate(
+            watermark=Max("updated_at")
+        )["watermark"]
+        if self._watermark is None:
+            self._postings.clear()
+            self._recipes.clear()
+            self._load(
+                IngredientInRecipe.objects.filter(
+                    recipe__deleted_at__isnull=True
+                )
+            )
+        else:
+            changed = set(
+                Recipe.objects.filter(
+                    updated_at__gte=self._watermark - REFRESH_OVERLAP
+                ).values_list("id", flat=True)
+            )
+            existing = set(Recipe.objects.values_list("id", flat=True))
+            for recipe_id in changed | (set(self._recipes) - existing):
+                self._remove(recipe_id)
+            self._load(
+                IngredientInRecipe.objects.filter(recipe_id__in=changed)
+            )
+        self._watermark = watermark
+
+    def _load(self, queryset):
+        rows = queryset.order_by().values_list("recipe_id", "ingredient_id")
+        for recipe_id, ingredient_id in rows.iterator():
+            self._postings.setdefault(ingredient_id, set()).add(recipe_id)
+            self._recipes.setdefault(recipe_id, set()).add(ingredient_id)
+
+    def _remove(self, recipe_id):
+        for ingredient_id in self._recipes.pop(recipe_id, ()):
+            posting = self._postings[ingredient_id]
+            posting.discard(recipe_id)
+            if not posting:
+                del self._postings[ingredient_id]
+
+
+ingredient_index = IngredientIndex()
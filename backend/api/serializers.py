@@ -1,3 +1,5 @@
+from django.db import transaction
+from django.db.models import Manager, prefetch_related_objects
 from django.shortcuts import get_object_or_404
 from djoser.serializers import UserCreateSerializer, UserSerializer
 from drf_extra_fields.fields import Base64ImageField
@@ -5,6 +7,9 @@ from rest_framework import serializers, status
 from rest_framework.fields import SerializerMethodField
 from rest_framework.serializers import PrimaryKeyRelatedField
 
+from .cache import get_recipe_fragments
+from .counters import recipe_views
+from .utils import get_followed_ids, get_viewer_state
 from recipes.models import (
     Favorite,
     Ingredient,
@@ -31,10 +36,35 @@ class UserSerializer(UserSerializer):
         )
 
     def get_is_subscribed(self, obj):
-        user = self.context.get("request").user
-        if user.is_anonymous:
-            return False
-        return Following.objects.filter(follower=user, following=obj).exists()
+        if hasattr(obj, "is_subscribed"):
+            return obj.is_subscribed
+        return obj.id in get_followed_ids(self.context.get("request"))
+
+
+class UserProfileSerializer(UserSerializer):
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + (
+            "recipes_count",
+            "followers_count",
+            "following_count",
+        )
+        read_only_fields = (
+            "recipes_count",
+            "followers_count",
+            "following_count",
+        )
+
+
+class AuthorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = (
+            "id",
+            "first_name",
+            "last_name",
+            "username",
+            "email",
+        )
 
 
 class UserCreateSerializer(UserCreateSerializer):
@@ -44,12 +74,17 @@ class UserCreateSerializer(UserCreateSerializer):
 
 
 class FollowingSerializer(UserSerializer):
-    recipes_count = SerializerMethodField()
     recipes = SerializerMethodField()
 
     class Meta(UserSerializer.Meta):
         fields = UserSerializer.Meta.fields + ("recipes_count", "recipes")
-        read_only_fields = ("first_name", "last_name", "username", "email")
+        read_only_fields = (
+            "first_name",
+            "last_name",
+            "username",
+            "email",
+            "recipes_count",
+        )
 
     def validate(self, data):
         follower = self.context.get("request").user
@@ -71,9 +106,6 @@ class FollowingSerializer(UserSerializer):
             )
         return data
 
-    def get_recipes_count(self, obj):
-        return obj.recipe.count()
-
     def get_recipes(self, obj):
         request = self.context.get("request")
         limit = request.GET.get("recipes_limit")
@@ -113,15 +145,13 @@ class IngredientInRecipeSerializer(serializers.ModelSerializer):
         )
 
 
-class RecipeReadSerializer(serializers.ModelSerializer):
-    author = UserSerializer(many=False, read_only=True)
+class RecipeFragmentSerializer(serializers.ModelSerializer):
+    author = AuthorSerializer(read_only=True)
     ingredients = IngredientInRecipeSerializer(
         many=True, source="ingredient_in_recipe"
     )
     tags = TagSerializer(many=True, read_only=True)
     image = Base64ImageField()
-    is_favorited = serializers.SerializerMethodField()
-    is_in_shopping_cart = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
@@ -134,25 +164,63 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             "tags",
             "image",
             "text",
+        )
+
+
+class RecipeListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        recipes = list(data.all() if isinstance(data, Manager) else data)
+        return self.child.represent(recipes)
+
+
+class RecipeReadSerializer(RecipeFragmentSerializer):
+    is_favorited = serializers.BooleanField(read_only=True)
+    is_in_shopping_cart = serializers.BooleanField(read_only=True)
+    views = serializers.IntegerField(read_only=True)
+
+    class Meta(RecipeFragmentSerializer.Meta):
+        fields = RecipeFragmentSerializer.Meta.fields + (
             "is_favorited",
             "is_in_shopping_cart",
+            "views",
         )
+        list_serializer_class = RecipeListSerializer
 
-    def get_ingredients(self, obj):
-        ingredients = obj.ingredient_in_recipe.all()
-        return IngredientInRecipeSerializer(ingredients, many=True).data
-
-    def get_is_favorited(self, obj):
-        user = self.context.get("request").user
-        if user.is_anonymous:
-            return False
-        return user.favorites.filter(recipe=obj).exists()
+    def to_representation(self, instance):
+        return self.represent([instance])[0]
 
-    def get_is_in_shopping_cart(self, obj):
-        user = self.context.get("request").user
-        if user.is_anonymous:
-            return False
-        return user.shopping_cart.filter(recipe=obj).exists()
+    def represent(self, recipes):
+        request = self.context.get("request")
+        viewer_state = get_viewer_state(
+            getattr(request, "user", None), recipes
+        )
+        fragments = get_recipe_fragments(recipes, self.render_fragments)
+        return [
+            self.overlay(fragments[recipe.id], recipe, viewer_state, request)
+            for recipe in recipes
+        ]
+
+    def render_fragments(self, recipes):
+        prefetch_related_objects(
+            recipes, "author", "tags", "ingredient_in_recipe__ingredient"
+        )
+        return RecipeFragmentSerializer(recipes, many=True).data
+
+    def overlay(self, fragment, recipe, viewer_state, request):
+        data = dict(fragment)
+        if request is not None and data["image"]:
+            data["image"] = request.build_absolute_uri(data["image"])
+        if data["author"] is not None:
+            data["author"] = dict(
+                data["author"],
+                is_subscribed=recipe.author_id in viewer_state.subscribed,
+            )
+        data["is_favorited"] = recipe.id in viewer_state.favorited
+        data["is_in_shopping_cart"] = (
+            recipe.id in viewer_state.in_shopping_cart
+        )
+        data["views"] = recipe.views + recipe_views.pending(recipe.id)
+        return data
 
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
@@ -161,6 +229,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
     cooking_time = serializers.IntegerField()
     tags = PrimaryKeyRelatedField(many=True, queryset=Tag.objects.all())
     image = Base64ImageField()
+    check_ingredients_exist = True
 
     class Meta:
         model = Recipe
@@ -182,7 +251,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                 "Нужно выбрать хотя бы один ингредиент!"
             )
         for ingredient in ingredients:
-            ingredient_id = ingredient["id"]
+            ingredient_id = ingredient["ingredient"]["id"]
             if ingredient_id in ingredients_set:
                 raise serializers.ValidationError(
                     "Ингредиенты должны быть уникальными!"
@@ -192,6 +261,12 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                     "Количество ингредиента должно быть больше 0!"
                 )
             ingredients_set.add(ingredient_id)
+        if self.check_ingredients_exist:
+            existing = Ingredient.objects.filter(
+                id__in=ingredients_set
+            ).count()
+            if existing != len(ingredients_set):
+                raise serializers.ValidationError("Ингредиент не найден!")
         return ingredients
 
     def validate_cooking_time(self, cooking_time):
@@ -219,7 +294,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         IngredientInRecipe.objects.bulk_create(
             [
                 IngredientInRecipe(
-                    ingredient=Ingredient.objects.get(id=ingredient["id"]),
+                    ingredient_id=ingredient["ingredient"]["id"],
                     recipe=recipe,
                     amount=ingredient["amount"],
                 )
@@ -227,6 +302,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             ]
         )
 
+    @transaction.atomic
     def create(self, validated_data):
         request = self.context.get("request", None)
         ingredients = validated_data.pop("ingredients")
@@ -236,6 +312,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         self.create_ingredients(recipe, ingredients)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         tags = validated_data.pop("tags")
         ingredients = validated_data.pop("ingredients")
@@ -258,6 +335,22 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         return RecipeReadSerializer(instance, context=context).data
 
 
+class RecipeImportSerializer(RecipeCreateSerializer):
+    tags = serializers.ListField(child=serializers.IntegerField())
+    image = serializers.CharField()
+    check_ingredients_exist = False
+
+    class Meta(RecipeCreateSerializer.Meta):
+        fields = (
+            "name",
+            "ingredients",
+            "cooking_time",
+            "tags",
+            "image",
+            "text",
+        )
+
+
 class RecipeShortSerializer(serializers.ModelSerializer):
     class Meta:
         model = Recipe
@@ -0,0 +1,114 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_generations
+from .publisher import schedule_publish
+from recipes.models import Ingredient, IngredientInRecipe, Recipe, Tag
+from users.models import Following, User
+
+CATALOGUE_NAMESPACES = {Tag: "tags", Ingredient: "ingredients"}
+
+
+def invalidate_recipes(recipe_ids, touch=True):
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids:
+        return
+    if touch:
+        Recipe.objects.filter(id__in=recipe_ids).update(
+            updated_at=timezone.now()
+        )
+    bump_generations(["recipes"])
+    transaction.on_commit(schedule_publish)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def recipe_changed(sender, instance, **kwargs):
+    invalidate_recipes([instance.id], touch=False)
+
+
+@receiver(post_save, sender=IngredientInRecipe)
+@receiver(post_delete, sender=IngredientInRecipe)
+def recipe_ingredient_changed(sender, instance, **kwargs):
+    invalidate_recipes([instance.recipe_id])
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def recipe_relations_changed(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            invalidate_recipes([instance.id])
+    elif action in ("post_add", "post_remove"):
+        invalidate_recipes(pk_set)
+    elif action == "pre_clear":
+        invalidate_recipes(
+            instance.recipe.values_list("id", flat=True)
+        )
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(pre_delete, sender=Ingredient)
+def catalogue_changed(sender, instance, **kwargs):
+    bump_generations([CATALOGUE_NAMESPACES[sender]])
+    if sender is Tag:
+        transaction.on_commit(schedule_publish)
+    invalidate_recipes(instance.recipe.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {"last_login", "password"}:
+        return
+    bump_generations(["users"])
+    invalidate_recipes(instance.recipe.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Following)
+@receiver(post_delete, sender=Following)
+def following_changed(sender, instance, **kwargs):
+    bump_generations(["following"])
+
+
+def change_counter(user_id, field, delta):
+    users = User.objects.filter(pk=user_id)
+    if delta < 0:
+        users = users.filter(**{f"{field}__gte": -delta})
+    users.update(**{field: F(field) + delta})
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    if created and instance.author_id is not None:
+        change_counter(instance.author_id, "recipes_count", 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    if instance.author_id is not None:
+        change_counter(instance.author_id, "recipes_count", -1)
+
+
+@receiver(post_save, sender=Following)
+def following_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(instance.follower_id, "following_count", 1)
+        change_counter(instance.following_id, "followers_count", 1)
+
+
+@receiver(post_delete, sender=Following)
+def following_deleted(sender, instance, **kwargs):
+    change_counter(instance.follower_id, "following_count", -1)
+    change_counter(instance.following_id, "followers_count", -1)
@@ -0,0 +1,111 @@
+import multiprocessing
+
+from django.db import connection, connections
+from django.test import TransactionTestCase
+
+from .cache import LocalCache, bump_generations
+from .search import IngredientIndex
+from recipes.models import Ingredient, IngredientInRecipe, Recipe, Tag
+from users.models import User
+
+WORKERS = 3
+
+
+def serve(channel, ingredient_id):
+    tags_cache = LocalCache("tags")
+    index = IngredientIndex()
+    try:
+        while channel.recv() == "read":
+            tags = tags_cache.get(
+                "names",
+                lambda: sorted(Tag.objects.values_list("name", flat=True)),
+            )
+            channel.send((tags, sorted(index.search([ingredient_id]))))
+    finally:
+        connections.close_all()
+        channel.close()
+
+
+class CacheCoherenceTest(TransactionTestCase):
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Процессам нужна общая база, а не база в памяти")
+        self.author = User.objects.create_user(
+            username="author", email="author@example.com", password="pass"
+        )
+        self.tag = Tag.objects.create(
+            name="Завтрак", color="#E26C2D", slug="breakfast"
+        )
+        self.ingredient = Ingredient.objects.create(
+            name="яйца", measurement_unit="шт"
+        )
+        self.first = self.create_recipe("Омлет")
+
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        self.workers = []
+        for _ in range(WORKERS):
+            channel, child = context.Pipe()
+            process = context.Process(
+                target=serve, args=(child, self.ingredient.id)
+            )
+            process.start()
+            child.close()
+            self.workers.append((process, channel))
+
+    def tearDown(self):
+        for process, channel in getattr(self, "workers", ()):
+            channel.send("stop")
+            channel.close()
+            process.join(10)
+
+    def create_recipe(self, name):
+        recipe = Recipe.objects.bulk_create(
+            [
+                Recipe(
+                    name=name,
+                    author=self.author,
+                    cooking_time=10,
+                    text="Описание",
+                    image="recipes/test.png",
+                )
+            ]
+        )[0]
+        IngredientInRecipe.objects.bulk_create(
+            [
+                IngredientInRecipe(
+                    recipe=recipe, ingredient=self.ingredient, amount=2
+                )
+            ]
+        )
+        return recipe
+
+    def read(self):
+        for _, channel in self.workers:
+            channel.send("read")
+        return [channel.recv() for _, channel in self.workers]
+
+    def test_workers_refresh_after_generation_bump(self):
+        self.assertEqual(
+            self.read(), [(["Завтрак"], [self.first.id])] * WORKERS
+        )
+
+        Tag.objects.filter(pk=self.tag.pk).update(name="Обед")
+        second = self.create_recipe("Яичница")
+        self.assertEqual(
+            self.read(), [(["Завтрак"], [self.first.id])] * WORKERS
+        )
+
+        bump_generations(["tags", "recipes"])
+        self.assertEqual(
+            self.read(),
+            [(["Обед"], sorted([self.first.id, second.id]))] * WORKERS,
+        )
+
+    def test_signals_bump_generations_for_other_workers(self):
+        self.read()
+        Tag.objects.create(name="Ужин", color="#49B64E", slug="dinner")
+        self.assertEqual(
+            [tags for tags, _ in self.read()],
+            [["Завтрак", "Ужин"]] * WORKERS,
+        )
@@ -0,0 +1,134 @@
+import logging
+import math
+import os
+import sqlite3
+import tempfile
+from random import random
+from threading import local
+from time import time
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketStore:
+    def __init__(self, path, capacity, refill_rate):
+        self.path = path
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self._local = local()
+
+    def get_connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            try:
+                connection = self.connect(self.path)
+            except (OSError, sqlite3.Error):
+                fallback = os.path.join(
+                    tempfile.gettempdir(), os.path.basename(self.path)
+                )
+                logger.warning(
+                    "Хранилище ограничений запросов %s недоступно, "
+                    "используется %s",
+                    self.path,
+                    fallback,
+                )
+                self.path = fallback
+                connection = self.connect(fallback)
+            self._local.connection = connection
+        return connection
+
+    def connect(self, path):
+        os.makedirs(os.path.dirname(path) or os.curdir, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=1, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=OFF")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS bucket ("
+            "key TEXT PRIMARY KEY, tokens REAL, updated REAL)"
+        )
+        return connection
+
+    def take(self, key, cost):
+        connection = self.get_connection()
+        now = time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tokens, updated FROM bucket WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = self.capacity
+            if row is not None:
+                tokens = min(
+                    self.capacity,
+                    row[0] + (now - row[1]) * self.refill_rate,
+                )
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            connection.execute(
+                "INSERT OR REPLACE INTO bucket VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+            if random() < settings.THROTTLE_PRUNE_PROBABILITY:
+                connection.execute(
+                    "DELETE FROM bucket WHERE updated < ?",
+                    (now - self.capacity / self.refill_rate,),
+                )
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+        return allowed, tokens
+
+    def get_wait(self, tokens, cost):
+        return max(cost - tokens, 0) / self.refill_rate
+
+    def get_reset(self, tokens):
+        return (self.capacity - tokens) / self.refill_rate
+
+
+bucket_store = TokenBucketStore(
+    settings.THROTTLE_STORE,
+    capacity=settings.THROTTLE_CAPACITY,
+    refill_rate=settings.THROTTLE_REFILL_RATE,
+)
+
+
+class CostThrottle(BaseThrottle):
+    def get_cost(self, request, view):
+        costs = getattr(view, "throttle_costs", {})
+        cost = costs.get(getattr(view, "action", None), 1)
+        limit = request.query_params.get("limit", "")
+        if limit.isdigit():
+            cost *= math.ceil(int(limit) / settings.THROTTLE_LIMIT_UNIT) or 1
+        return min(cost, bucket_store.capacity)
+
+    def get_cache_key(self, request):
+        if request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+    def allow_request(self, request, view):
+        self.cost = self.get_cost(request, view)
+        try:
+            allowed, self.tokens = bucket_store.take(
+                self.get_cache_key(request), self.cost
+            )
+        except (OSError, sqlite3.Error):
+            logger.exception("Хранилище ограничений запросов недоступно")
+            return True
+        request._request.rate_limit = {
+            "X-RateLimit-Limit": bucket_store.capacity,
+            "X-RateLimit-Remaining": math.floor(self.tokens),
+            "X-RateLimit-Reset": math.ceil(
+                bucket_store.get_reset(self.tokens)
+            ),
+            "X-RateLimit-Cost": self.cost,
+        }
+        return allowed
+
+    def wait(self):
+        return bucket_store.get_wait(self.tokens, self.cost)
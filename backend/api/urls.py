@@ -1,7 +1,13 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import IngredientViewSet, RecipeViewSet, TagViewSet, UserViewSet
+from .views import (
+    IngredientViewSet,
+    ProfileViewSet,
+    RecipeViewSet,
+    TagViewSet,
+    UserViewSet,
+)
 
 app_name = "api"
 
@@ -10,6 +16,7 @@ router.register("tags", TagViewSet, basename="tags")
 router.register("ingredients", IngredientViewSet, basename="ingredients")
 router.register("recipes", RecipeViewSet, basename="recipes")
 router.register("users", UserViewSet, basename="users")
+router.register("profiles", ProfileViewSet, basename="profiles")
 
 
 urlpatterns = [
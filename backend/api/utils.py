@@ -1,11 +1,111 @@
-from django.db.models import Sum
+from datetime import timedelta
 
-from recipes.models import IngredientInRecipe
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Count, Max, Q, Sum, Value
+from django.utils import timezone
+
+from recipes.models import (
+    Favorite,
+    IngredientInRecipe,
+    Recipe,
+    RecipeActivity,
+    ShoppingCart,
+    Tag,
+)
+from users.models import Following
+
+COOKING_TIME_BUCKETS = ((1, 15), (16, 30), (31, 60), (61, None))
+FACET_AUTHORS_LIMIT = 10
+
+
+class ViewerState:
+    def __init__(self, favorited=(), in_shopping_cart=(), subscribed=()):
+        self.favorited = set(favorited)
+        self.in_shopping_cart = set(in_shopping_cart)
+        self.subscribed = set(subscribed)
+
+
+def get_followed_ids(request):
+    user = getattr(request, "user", None)
+    if user is None or user.is_anonymous:
+        return set()
+    if not hasattr(request, "followed_ids"):
+        request.followed_ids = set(
+            Following.objects.filter(follower=user).values_list(
+                "following_id", flat=True
+            )
+        )
+    return request.followed_ids
+
+
+def get_viewer_state(user, recipes):
+    if user is None or user.is_anonymous or not recipes:
+        return ViewerState()
+
+    recipe_ids = [recipe.id for recipe in recipes]
+    author_ids = {recipe.author_id for recipe in recipes}
+    favorites = (
+        Favorite.objects.filter(user=user, recipe_id__in=recipe_ids)
+        .order_by()
+        .values_list("recipe_id", Value("favorite", CharField()))
+    )
+    shopping_cart = (
+        ShoppingCart.objects.filter(user=user, recipe_id__in=recipe_ids)
+        .order_by()
+        .values_list("recipe_id", Value("shopping_cart", CharField()))
+    )
+    subscriptions = (
+        Following.objects.filter(follower=user, following_id__in=author_ids)
+        .order_by()
+        .values_list("following_id", Value("following", CharField()))
+    )
+
+    state = ViewerState()
+    sets = {
+        "favorite": state.favorited,
+        "shopping_cart": state.in_shopping_cart,
+        "following": state.subscribed,
+    }
+    for object_id, kind in favorites.union(
+        shopping_cart, subscriptions, all=True
+    ):
+        sets[kind].add(object_id)
+    return state
+
+
+def get_viewer_version(user):
+    if user.is_anonymous:
+        return "anonymous"
+
+    favorites = Favorite.objects.filter(user=user).values("user")
+    shopping_cart = ShoppingCart.objects.filter(user=user).values("user")
+    subscriptions = Following.objects.filter(follower=user).values(
+        "follower"
+    )
+    watermarks = [
+        queryset.order_by()
+        .annotate(
+            kind=Value(kind, CharField()), total=Count("id"), last=Max("id")
+        )
+        .values_list("kind", "total", "last")
+        for kind, queryset in (
+            ("favorite", favorites),
+            ("shopping_cart", shopping_cart),
+            ("following", subscriptions),
+        )
+    ]
+    rows = watermarks[0].union(*watermarks[1:], all=True)
+    return f"{user.id}:" + ";".join(
+        f"{kind}={total}.{last}" for kind, total, last in sorted(rows)
+    )
 
 
 def get_shopping_list(user):
     ingredients = (
-        IngredientInRecipe.objects.filter(recipe__shopping_cart__user=user)
+        IngredientInRecipe.objects.filter(
+            recipe__shopping_cart__user=user, recipe__deleted_at=None
+        )
         .values("ingredient__name", "ingredient__measurement_unit")
         .annotate(amount=Sum("amount"))
     )
@@ -19,3 +119,77 @@ def get_shopping_list(user):
         )
 
     return shopping_list
+
+
+def get_recipe_facets(queryset):
+    recipes = Recipe.objects.filter(id__in=queryset.order_by().values("id"))
+
+    tags = (
+        Tag.objects.filter(recipe__in=recipes)
+        .annotate(count=Count("recipe"))
+        .values("id", "name", "slug", "count")
+        .order_by("-count", "name")
+    )
+
+    buckets = recipes.aggregate(
+        **{
+            str(index): Count(
+                "id",
+                filter=Q(cooking_time__gte=low)
+                & (Q(cooking_time__lte=high) if high else Q()),
+            )
+            for index, (low, high) in enumerate(COOKING_TIME_BUCKETS)
+        }
+    )
+
+    authors = (
+        recipes.values(
+            "author_id",
+            "author__username",
+            "author__first_name",
+            "author__last_name",
+        )
+        .annotate(count=Count("id"))
+        .order_by("-count", "author_id")[:FACET_AUTHORS_LIMIT]
+    )
+
+    return {
+        "tags": list(tags),
+        "cooking_time": [
+            {"min": low, "max": high, "count": buckets[str(index)]}
+            for index, (low, high) in enumerate(COOKING_TIME_BUCKETS)
+        ],
+        "authors": [
+            {
+                "id": author["author_id"],
+                "username": author["author__username"],
+                "first_name": author["author__first_name"],
+                "last_name": author["author__last_name"],
+                "count": author["count"],
+            }
+            for author in authors
+        ],
+    }
+
+
+def get_trending_recipe_ids():
+    recipe_ids = cache.get("trending-recipes")
+    if recipe_ids is not None:
+        return recipe_ids
+
+    now = timezone.now()
+    activity = RecipeActivity.objects.filter(
+        hour__gte=now - timedelta(hours=settings.TRENDING_WINDOW_HOURS)
+    ).values_list("recipe_id", "hour", "favorites", "shopping_cart")
+    scores = {}
+    for recipe_id, hour, favorites, shopping_cart in activity:
+        age = (now - hour).total_seconds() / 3600
+        scores[recipe_id] = scores.get(recipe_id, 0) + (
+            favorites + shopping_cart
+        ) * 0.5 ** (age / settings.TRENDING_HALF_LIFE_HOURS)
+
+    recipe_ids = sorted(scores, key=lambda recipe_id: -scores[recipe_id])[
+        : settings.TRENDING_LIMIT
+    ]
+    cache.set("trending-recipes", recipe_ids, settings.TRENDING_CACHE_TIMEOUT)
+    return recipe_ids
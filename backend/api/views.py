@@ -1,16 +1,38 @@
-from django.http import HttpResponse
-from django.shortcuts import get_object_or_404
+from hashlib import md5
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count, Exists, Max, OuterRef, Sum, Value
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import (
+    IsAdminUser,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly,
 )
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 
+from .cache import LocalCache
+from .counters import recipe_views
 from .filters import IngredientFilter, RecipeFilter
+from .importer import RecipeImporter
 from .pagination import CustomPagination
 from .permissions import IsAdminOrReadOnly, IsAuthorOrReadOnly
 from .serializers import (
@@ -19,25 +41,57 @@ from .serializers import (
     IngredientSerializer,
     RecipeCreateSerializer,
     RecipeReadSerializer,
+    RecipeShortSerializer,
     ShoppingCartSerializer,
     TagSerializer,
+    UserProfileSerializer,
     UserSerializer,
 )
-from .utils import get_shopping_list
-from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from .utils import (
+    get_recipe_facets,
+    get_shopping_list,
+    get_trending_recipe_ids,
+    get_viewer_version,
+)
+from recipes.deletion import soft_delete_recipe, soft_delete_user
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeNeighbour,
+    ShoppingCart,
+    Tag,
+)
 from users.models import Following, User
 
+PERSONAL_FILTERS = ("is_favorited", "is_in_shopping_cart")
+
 
-class TagViewSet(viewsets.ModelViewSet):
+class CachedListMixin:
+    list_cache = None
+
+    def list(self, request, *args, **kwargs):
+        data = self.list_cache.get(
+            request.get_full_path(),
+            lambda: super(CachedListMixin, self)
+            .list(request, *args, **kwargs)
+            .data,
+        )
+        return Response(data)
+
+
+class TagViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = None
+    list_cache = LocalCache("tags")
 
 
-class IngredientViewSet(viewsets.ModelViewSet):
+class IngredientViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
+    list_cache = LocalCache("ingredients")
     permission_classes = (IsAuthenticatedOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
@@ -50,12 +104,106 @@ class RecipeViewSet(viewsets.ModelViewSet):
     pagination_class = CustomPagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
+    facets_cache = LocalCache("recipes")
+    throttle_costs = {
+        "create": 5,
+        "update": 5,
+        "partial_update": 5,
+        "facets": 3,
+        "download_shopping_cart": 20,
+        "export": 60,
+        "import_recipes": 60,
+    }
 
     def get_serializer_class(self):
         if self.request.method == "GET":
             return RecipeReadSerializer
         return RecipeCreateSerializer
 
+    def list(self, request, *args, **kwargs):
+        if "ids" in request.query_params:
+            return self.list_by_ids(request)
+        watermark = (
+            self.filter_queryset(self.get_queryset())
+            .order_by()
+            .aggregate(
+                last_modified=Max("updated_at"),
+                count=Count("id"),
+                views=Sum("views"),
+            )
+        )
+        etag = 'W/"{}"'.format(
+            self.make_etag(
+                request.get_full_path(),
+                watermark["last_modified"],
+                watermark["count"],
+                watermark["views"],
+            )
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        self.set_validators(response, etag)
+        return response
+
+    def list_by_ids(self, request):
+        try:
+            recipe_ids = list(
+                dict.fromkeys(
+                    int(recipe_id)
+                    for recipe_id in request.query_params["ids"].split(",")
+                )
+            )
+        except ValueError:
+            raise ValidationError({"ids": "Ожидается список чисел."})
+        if len(recipe_ids) > settings.RECIPE_IDS_LIMIT:
+            raise ValidationError(
+                {
+                    "ids": "Можно запросить не больше "
+                    f"{settings.RECIPE_IDS_LIMIT} рецептов."
+                }
+            )
+        recipes = self.get_queryset().in_bulk(recipe_ids)
+        serializer = RecipeReadSerializer(
+            [recipes[pk] for pk in recipe_ids if pk in recipes],
+            many=True,
+            context=self.get_serializer_context(),
+        )
+        return Response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        updated_at, views = get_object_or_404(
+            self.get_queryset().values_list("updated_at", "views"),
+            pk=kwargs["pk"],
+        )
+        recipe_views.increment(int(kwargs["pk"]))
+        etag = '"{}"'.format(self.make_etag(kwargs["pk"], updated_at, views))
+        last_modified = None
+        if request.user.is_anonymous:
+            last_modified = int(updated_at.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        self.set_validators(response, etag, last_modified)
+        return response
+
+    def perform_destroy(self, instance):
+        soft_delete_recipe(instance)
+
+    def make_etag(self, *parts):
+        parts += (get_viewer_version(self.request.user),)
+        return md5(
+            "|".join(map(str, parts)).encode(), usedforsecurity=False
+        ).hexdigest()
+
+    def set_validators(self, response, etag, last_modified=None):
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        patch_vary_headers(response, ("Authorization",))
+
     @action(
         detail=True,
         methods=("POST",),
@@ -102,6 +250,124 @@ class RecipeViewSet(viewsets.ModelViewSet):
         ).delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=["GET"])
+    def facets(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.is_personal_filter(request):
+            return Response(get_recipe_facets(queryset))
+        key = tuple(
+            sorted(
+                (name, tuple(sorted(values)))
+                for name, values in request.query_params.lists()
+                if name not in ("page", "limit")
+            )
+        )
+        if any(name in request.query_params for name in PERSONAL_FILTERS):
+            key += (request.user.pk,)
+        return Response(
+            self.facets_cache.get(key, lambda: get_recipe_facets(queryset))
+        )
+
+    def is_personal_filter(self, request):
+        if not request.user.is_authenticated:
+            return False
+        filterset = self.filterset_class(
+            request.query_params,
+            queryset=self.get_queryset(),
+            request=request,
+        )
+        return filterset.is_valid() and any(
+            filterset.form.cleaned_data.get(name)
+            for name in PERSONAL_FILTERS
+        )
+
+    @action(detail=False, methods=["GET"])
+    def trending(self, request):
+        recipe_ids = get_trending_recipe_ids()
+        recipes = self.get_queryset().in_bulk(recipe_ids)
+        serializer = RecipeReadSerializer(
+            [recipes[pk] for pk in recipe_ids if pk in recipes],
+            many=True,
+            context={"request": request},
+        )
+        return Response(serializer.data)
+
+    @action(detail=True, methods=["GET"])
+    def similar(self, request, pk):
+        recipe = self.get_object()
+        neighbours = RecipeNeighbour.objects.filter(
+            recipe=recipe, neighbour__deleted_at=None
+        ).select_related("neighbour")
+        serializer = RecipeShortSerializer(
+            [neighbour.neighbour for neighbour in neighbours],
+            many=True,
+            context={"request": request},
+        )
+        return Response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=["GET"],
+        permission_classes=[IsAuthenticated],
+    )
+    def export(self, request):
+        queryset = Recipe.objects.order_by("id")
+        deleted = Recipe.all_objects.none()
+        updated_since = request.query_params.get("updated_since")
+        if updated_since:
+            updated_since = parse_datetime(updated_since)
+            if updated_since is None:
+                raise ValidationError(
+                    {"updated_since": "Неверный формат даты и времени."}
+                )
+            if timezone.is_naive(updated_since):
+                updated_since = timezone.make_aware(updated_since)
+            queryset = queryset.filter(updated_at__gte=updated_since)
+            deleted = Recipe.all_objects.filter(
+                deleted_at__gte=updated_since
+            )
+        exported_at = timezone.now()
+        response = StreamingHttpResponse(
+            self.stream_recipes(
+                queryset, deleted, settings.EXPORT_CHUNK_SIZE
+            ),
+            content_type="application/x-ndjson",
+        )
+        response["X-Exported-At"] = exported_at.isoformat()
+        return response
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="import",
+        permission_classes=[IsAuthenticated],
+    )
+    def import_recipes(self, request):
+        recipes = RecipeImporter(
+            request.user, limit=settings.RECIPE_IMPORT_LIMIT
+        ).run(request.data)
+        serializer = RecipeShortSerializer(
+            recipes, many=True, context={"request": request}
+        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def stream_recipes(self, queryset, deleted, chunk_size):
+        context = self.get_serializer_context()
+        encoder = JSONEncoder(ensure_ascii=False)
+        recipes = queryset.iterator(chunk_size=chunk_size)
+        while chunk := list(islice(recipes, chunk_size)):
+            serializer = RecipeReadSerializer(
+                chunk, many=True, context=context
+            )
+            yield "".join(
+                encoder.encode(item) + "\n" for item in serializer.data
+            ).encode()
+        deleted = deleted.order_by("id").values_list("id", flat=True)
+        for recipe_id in deleted.iterator(chunk_size=chunk_size):
+            yield (
+                encoder.encode({"id": recipe_id, "deleted": True}) + "\n"
+            ).encode()
+
     @action(detail=False, methods=["GET"])
     def download_shopping_cart(self, request):
         shopping_list = get_shopping_list(request.user)
@@ -113,8 +379,28 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
 class UserViewSet(UserViewSet):
     queryset = User.objects.all()
-    serializer_class = UserSerializer
+    serializer_class = UserProfileSerializer
     pagination_class = CustomPagination
+    filter_backends = (OrderingFilter,)
+    ordering_fields = ("recipes_count", "followers_count", "following_count")
+    ordering = ("id",)
+    throttle_costs = {"subscribe": 3, "subscriptions": 3}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_anonymous:
+            return queryset.annotate(is_subscribed=Value(False))
+        return queryset.annotate(
+            is_subscribed=Exists(
+                Following.objects.filter(
+                    follower=user, following=OuterRef("pk")
+                )
+            )
+        )
+
+    def perform_destroy(self, instance):
+        soft_delete_user(instance)
 
     @action(
         detail=True,
@@ -140,10 +426,31 @@ class UserViewSet(UserViewSet):
             subscription.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, permission_classes=[IsAuthenticated])
+    def suggestions(self, request):
+        queryset = (
+            User.objects.filter(suggested_to__user=request.user)
+            .exclude(following__follower=request.user)
+            .annotate(is_subscribed=Value(False))
+            .order_by("-suggested_to__score", "id")
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = UserSerializer(
+                page, many=True, context={"request": request}
+            )
+            return self.get_paginated_response(serializer.data)
+        serializer = UserSerializer(
+            queryset, many=True, context={"request": request}
+        )
+        return Response(serializer.data)
+
     @action(detail=False, permission_classes=[IsAuthenticated])
     def subscriptions(self, request):
         user = request.user
-        queryset = User.objects.filter(following__follower=user)
+        queryset = User.objects.filter(following__follower=user).annotate(
+            is_subscribed=Value(True)
+        )
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = FollowingSerializer(
@@ -154,3 +461,29 @@ class UserViewSet(UserViewSet):
             queryset, many=True, context={"request": request}
         )
         return Response(serializer.data)
+
+
+class ProfileViewSet(viewsets.ViewSet):
+    permission_classes = (IsAdminUser,)
+    lookup_value_regex = r"[\w\-]+\.prof"
+
+    def get_directory(self):
+        if not settings.PROFILE_DIR:
+            raise Http404
+        return Path(settings.PROFILE_DIR)
+
+    def list(self, request):
+        directory = self.get_directory()
+        profiles = sorted(directory.glob("*.prof"), reverse=True)
+        return Response(
+            [
+                {"name": path.name, "size": path.stat().st_size}
+                for path in profiles
+            ]
+        )
+
+    def retrieve(self, request, pk):
+        path = self.get_directory() / pk
+        if not path.is_file():
+            raise Http404
+        return FileResponse(path.open("rb"), as_attachment=True)
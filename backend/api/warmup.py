@@ -0,0 +1,67 @@
+import logging
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.test import RequestFactory
+from django.urls import get_resolver, resolve
+
+from .cache import end_generation_scope, start_generation_scope
+
+logger = logging.getLogger(__name__)
+
+RESOLVE_PATHS = (
+    "/api/tags/",
+    "/api/ingredients/",
+    "/api/recipes/",
+    "/api/recipes/1/",
+    "/api/recipes/1/favorite/",
+    "/api/recipes/1/shopping_cart/",
+    "/api/recipes/download_shopping_cart/",
+    "/api/users/",
+    "/api/users/me/",
+    "/api/users/1/subscribe/",
+    "/api/users/subscriptions/",
+    "/api/auth/token/login/",
+)
+
+
+def warm_urls():
+    get_resolver().url_patterns
+    for path in RESOLVE_PATHS:
+        resolve(path)
+
+
+def warm_views():
+    from .views import (
+        IngredientViewSet,
+        RecipeViewSet,
+        TagViewSet,
+        UserViewSet,
+    )
+
+    factory = RequestFactory(
+        SERVER_NAME=settings.ALLOWED_HOSTS[0],
+        HTTP_HOST=settings.ALLOWED_HOSTS[0],
+    )
+    for viewset, path in (
+        (TagViewSet, "/api/tags/"),
+        (IngredientViewSet, "/api/ingredients/"),
+        (RecipeViewSet, "/api/recipes/?limit=6"),
+        (UserViewSet, "/api/users/?limit=6"),
+    ):
+        view = viewset.as_view({"get": "list"}, throttle_classes=[])
+        start_generation_scope()
+        try:
+            view(factory.get(path)).render()
+        finally:
+            end_generation_scope()
+
+
+def warm_up():
+    warm_urls()
+    try:
+        warm_views()
+    except DatabaseError:
+        logger.exception("Не удалось прогреть представления API")
+    finally:
+        connections.close_all()
@@ -4,4 +4,12 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "foodgram.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from api.events import recipe_events  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http" and scope["path"] == "/api/events/":
+        return await recipe_events(scope, receive, send)
+    return await django_application(scope, receive, send)
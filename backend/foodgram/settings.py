@@ -32,12 +32,16 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "api.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "api.middleware.CacheGenerationMiddleware",
+    "api.middleware.RateLimitHeadersMiddleware",
+    "api.middleware.SlowRequestProfilerMiddleware",
 ]
 
 ROOT_URLCONF = "foodgram.urls"
@@ -66,6 +70,7 @@ if DEBUG:
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+            "TEST": {"NAME": os.path.join(BASE_DIR, "test_db.sqlite3")},
         }
     }
 else:
@@ -79,10 +84,78 @@ else:
             "PASSWORD": os.getenv("POSTGRES_PASSWORD", default="postgres"),
             "HOST": os.getenv("DB_HOST", default="db"),
             "PORT": os.getenv("DB_PORT", default="5432"),
+            "TEST": {"NAME": os.getenv("DB_TEST_NAME")},
         }
     }
 
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+    "compressed": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "compressed",
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+}
+
+RECIPE_CACHE_TIMEOUT = 60 * 60 * 24
+
+INGREDIENT_SEARCH_LIMIT = 500
+
+SIMILAR_RECIPES_TOP_K = 10
+
+AUTHOR_SUGGESTIONS_TOP_K = 20
+
+EXPORT_CHUNK_SIZE = 500
+
+RECIPE_IDS_LIMIT = 100
+
+RECIPE_IMPORT_LIMIT = 500
+RECIPE_IMPORT_BATCH_SIZE = 200
+RECIPE_IMPORT_WORKERS = 4
+
+EVENTS_POLL_INTERVAL = 2
+EVENTS_HEARTBEAT_INTERVAL = 15
+EVENTS_BATCH_SIZE = 100
+EVENTS_QUEUE_SIZE = 100
+EVENTS_RETRY = 5000
+
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_LEVEL = 6
+COMPRESSION_PATH_PREFIX = "/api/"
+COMPRESSION_CONTENT_TYPES = ["application/json"]
+COMPRESSION_CACHE_ALIAS = "compressed"
+COMPRESSION_CACHE_TIMEOUT = 10 * 60
+
+PRERENDER_ROOT = os.getenv("PRERENDER_ROOT")
+PRERENDER_HOST = os.getenv("PRERENDER_HOST", default=ALLOWED_HOSTS[0])
+PRERENDER_QUERIES = ["", "page=1&limit=6"]
+PRERENDER_TAG_QUERIES = ["page=1&limit=6&tags={slug}"]
+PRERENDER_DELAY = 5
+
+TRENDING_WINDOW_HOURS = 7 * 24
+TRENDING_HALF_LIFE_HOURS = 24
+TRENDING_LIMIT = 20
+TRENDING_CACHE_TIMEOUT = 5 * 60
+
+VIEW_COUNTER_FLUSH_INTERVAL = 10
+VIEW_COUNTER_FLUSH_SIZE = 500
+
+PROFILE_DIR = os.getenv("PROFILE_DIR")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", default=0.1))
+PROFILE_THRESHOLD = float(os.getenv("PROFILE_THRESHOLD", default=1.0))
+PROFILE_MIN_INTERVAL = 60
+PROFILE_MAX_FILES = 100
+PROFILE_VIEW_NAMES = [
+    "api:recipes-list",
+    "api:recipes-download-shopping-cart",
+    "api:users-subscriptions",
+]
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -105,14 +178,26 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.TokenAuthentication",
     ],
+    "DEFAULT_THROTTLE_CLASSES": [
+        "api.throttling.CostThrottle",
+    ],
+    "NUM_PROXIES": 1,
 }
 
+THROTTLE_STORE = os.getenv(
+    "THROTTLE_STORE", default="/dev/shm/foodgram-throttle.sqlite3"
+)
+THROTTLE_CAPACITY = int(os.getenv("THROTTLE_CAPACITY", default=120))
+THROTTLE_REFILL_RATE = float(os.getenv("THROTTLE_REFILL_RATE", default=2))
+THROTTLE_LIMIT_UNIT = 50
+THROTTLE_PRUNE_PROBABILITY = 0.001
+
 
 DJOSER = {
     "SERIALIZERS": {
         "user_create": "api.serializers.UserCreateSerializer",
-        "user": "api.serializers.UserSerializer",
-        "current_user": "api.serializers.UserSerializer",
+        "user": "api.serializers.UserProfileSerializer",
+        "current_user": "api.serializers.UserProfileSerializer",
     },
     "PERMISSIONS": {
         "user": ["djoser.permissions.CurrentUserOrAdminOrReadOnly"],
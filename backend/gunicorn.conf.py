@@ -0,0 +1,28 @@
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0:8000")
+preload_app = os.getenv("GUNICORN_WARM_BOOT", "true").lower() == "true"
+
+if "GUNICORN_WORKERS" in os.environ:
+    workers = int(os.environ["GUNICORN_WORKERS"])
+
+
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return
+    from api.warmup import warm_up
+
+    warm_up()
+
+
+def pre_fork(server, worker):
+    if server.cfg.preload_app:
+        from django.db import connections
+
+        connections.close_all()
+
+
+def worker_exit(server, worker):
+    from api.counters import recipe_views
+
+    recipe_views.flush()
@@ -1,6 +1,8 @@
 from django.contrib import admin
 
+from .deletion import soft_delete_recipe
 from .models import (
+    DeletionJob,
     Favorite,
     Ingredient,
     IngredientInRecipe,
@@ -10,6 +12,25 @@ from .models import (
 )
 
 
+class SoftDeleteAdminMixin:
+    soft_delete = None
+
+    def delete_model(self, request, obj):
+        self.soft_delete(obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self.soft_delete(obj)
+
+    def get_deleted_objects(self, objs, request):
+        return (
+            [str(obj) for obj in objs],
+            {self.model._meta.verbose_name_plural: len(objs)},
+            set(),
+            [],
+        )
+
+
 class IngredientInline(admin.TabularInline):
     model = IngredientInRecipe
     extra = 3
@@ -36,7 +57,7 @@ class IngredientAdmin(admin.ModelAdmin):
 
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     list_display = (
         "id",
         "name",
@@ -54,6 +75,7 @@ class RecipeAdmin(admin.ModelAdmin):
         "tags__name",
     )
     inlines = (IngredientInline,)
+    soft_delete = staticmethod(soft_delete_recipe)
 
     def recipe_in_favorite(self, obj):
         return obj.favorites.count()
@@ -84,3 +106,35 @@ class ShoppingCartAdmin(admin.ModelAdmin):
         "user",
         "recipe",
     )
+
+
+@admin.register(DeletionJob)
+class DeletionJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "kind",
+        "object_id",
+        "name",
+        "status",
+        "stage",
+        "deleted_rows",
+        "created_at",
+        "finished_at",
+    )
+    list_filter = (
+        "status",
+        "kind",
+    )
+    readonly_fields = (
+        "kind",
+        "object_id",
+        "name",
+        "stage",
+        "deleted_rows",
+        "error",
+        "created_at",
+        "finished_at",
+    )
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,99 @@
+from django.db import connection, models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DeletionJob, Recipe
+from users.models import Following, User
+
+
+@transaction.atomic
+def soft_delete_recipe(recipe):
+    recipe.deleted_at = timezone.now()
+    recipe.save(update_fields=["deleted_at", "updated_at"])
+    if recipe.author_id is not None:
+        User.objects.filter(
+            pk=recipe.author_id, recipes_count__gt=0
+        ).update(recipes_count=F("recipes_count") - 1)
+    return DeletionJob.objects.create(
+        kind=DeletionJob.RECIPE, object_id=recipe.pk, name=recipe.name[:254]
+    )
+
+
+@transaction.atomic
+def soft_delete_user(user):
+    deleted_at = timezone.now()
+    user.deleted_at = deleted_at
+    user.is_active = False
+    user.save(update_fields=["deleted_at", "is_active"])
+    Recipe.objects.filter(author=user).update(
+        deleted_at=deleted_at, updated_at=deleted_at
+    )
+    return DeletionJob.objects.create(
+        kind=DeletionJob.USER, object_id=user.pk, name=user.username
+    )
+
+
+def get_relations(model):
+    return [
+        field
+        for field in model._meta.get_fields(include_hidden=True)
+        if field.auto_created
+        and not field.concrete
+        and (field.one_to_many or field.one_to_one)
+    ]
+
+
+class BatchPurger:
+    def __init__(self, job, batch_size):
+        self.job = job
+        self.batch_size = batch_size
+
+    def run(self):
+        model = User if self.job.kind == DeletionJob.USER else Recipe
+        self.purge(model, [self.job.object_id])
+
+    def purge(self, model, pks):
+        for relation in get_relations(model):
+            on_delete = relation.on_delete
+            child = relation.related_model
+            lookup = {f"{relation.field.name}__in": pks}
+            if on_delete is models.CASCADE:
+                while ids := list(
+                    child._base_manager.filter(**lookup).values_list(
+                        "pk", flat=True
+                    )[: self.batch_size]
+                ):
+                    self.purge(child, ids)
+            elif on_delete is models.SET_NULL:
+                child._base_manager.filter(**lookup).update(
+                    **{relation.field.name: None}
+                )
+        self.delete(model, pks)
+
+    def delete(self, model, pks):
+        table = model._meta.db_table
+        column = model._meta.pk.column
+        placeholders = ", ".join(["%s"] * len(pks))
+        with transaction.atomic():
+            if model is Following:
+                self.release_following(pks)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {connection.ops.quote_name(table)} "
+                    f"WHERE {connection.ops.quote_name(column)} "
+                    f"IN ({placeholders})",
+                    pks,
+                )
+                deleted = cursor.rowcount
+            DeletionJob.objects.filter(pk=self.job.pk).update(
+                stage=table, deleted_rows=F("deleted_rows") + deleted
+            )
+
+    def release_following(self, pks):
+        rows = Following.objects.filter(pk__in=pks)
+        User._base_manager.filter(
+            pk__in=rows.values("follower"), following_count__gt=0
+        ).update(following_count=F("following_count") - 1)
+        User._base_manager.filter(
+            pk__in=rows.values("following"), followers_count__gt=0
+        ).update(followers_count=F("followers_count") - 1)
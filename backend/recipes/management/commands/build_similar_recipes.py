@@ -0,0 +1,129 @@
+from collections import Counter, defaultdict
+from heapq import nlargest
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from recipes.models import IngredientInRecipe, Recipe, RecipeNeighbour
+
+INGREDIENT_WEIGHT = 0.8
+TAG_WEIGHT = 0.2
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает похожие рецепты по ингредиентам и тегам"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Пересчитать все рецепты, а не только изменённые",
+        )
+        parser.add_argument(
+            "--top-k", type=int, default=settings.SIMILAR_RECIPES_TOP_K
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        computed_at = timezone.now()
+        top_k = options["top_k"]
+        self.load_vectors()
+
+        last_run = RecipeNeighbour.objects.aggregate(
+            last_run=Max("computed_at")
+        )["last_run"]
+        if options["full"] or last_run is None:
+            targets = set(self.ingredients)
+        else:
+            targets = self.get_touched(last_run, top_k)
+
+        targets = sorted(targets)
+        batch_size = options["batch_size"]
+        for start in range(0, len(targets), batch_size):
+            batch = targets[start:start + batch_size]
+            neighbours = [
+                RecipeNeighbour(
+                    recipe_id=recipe_id,
+                    neighbour_id=neighbour_id,
+                    score=score,
+                    computed_at=computed_at,
+                )
+                for recipe_id in batch
+                for neighbour_id, score in self.get_neighbours(
+                    recipe_id, top_k
+                )
+            ]
+            with transaction.atomic():
+                RecipeNeighbour.objects.filter(recipe_id__in=batch).delete()
+                RecipeNeighbour.objects.bulk_create(neighbours)
+
+        self.stdout.write(f"Пересчитано рецептов: {len(targets)}")
+
+    def load_vectors(self):
+        self.ingredients = defaultdict(set)
+        self.postings = defaultdict(set)
+        rows = (
+            IngredientInRecipe.objects.filter(recipe__deleted_at__isnull=True)
+            .order_by()
+            .values_list("recipe_id", "ingredient_id")
+        )
+        for recipe_id, ingredient_id in rows.iterator():
+            self.ingredients[recipe_id].add(ingredient_id)
+            self.postings[ingredient_id].add(recipe_id)
+
+        self.tags = defaultdict(set)
+        rows = Recipe.tags.through.objects.filter(
+            recipe__deleted_at__isnull=True
+        ).values_list("recipe_id", "tag_id")
+        for recipe_id, tag_id in rows.iterator():
+            self.tags[recipe_id].add(tag_id)
+
+    def get_touched(self, last_run, top_k):
+        touched = set(
+            Recipe.all_objects.filter(updated_at__gt=last_run).values_list(
+                "id", flat=True
+            )
+        )
+        affected = set(
+            RecipeNeighbour.objects.filter(
+                neighbour_id__in=touched
+            ).values_list("recipe_id", flat=True)
+        )
+        for recipe_id in touched:
+            affected.update(
+                neighbour_id
+                for neighbour_id, _ in self.get_neighbours(recipe_id, top_k)
+            )
+        incomplete = (
+            Recipe.objects.annotate(neighbours_count=Count("neighbours"))
+            .filter(neighbours_count__lt=top_k)
+            .values_list("id", flat=True)
+        )
+        affected.update(incomplete)
+        return (touched | affected) & set(self.ingredients)
+
+    def get_neighbours(self, recipe_id, top_k):
+        ingredients = self.ingredients[recipe_id]
+        tags = self.tags[recipe_id]
+        overlap = Counter()
+        for ingredient_id in ingredients:
+            overlap.update(self.postings[ingredient_id])
+        overlap.pop(recipe_id, None)
+
+        scores = {}
+        for candidate_id, common in overlap.items():
+            candidate_tags = self.tags[candidate_id]
+            ingredient_score = common / (
+                len(ingredients) + len(self.ingredients[candidate_id]) - common
+            )
+            tags_union = len(tags | candidate_tags)
+            tag_score = (
+                len(tags & candidate_tags) / tags_union if tags_union else 0
+            )
+            scores[candidate_id] = (
+                INGREDIENT_WEIGHT * ingredient_score + TAG_WEIGHT * tag_score
+            )
+        return nlargest(top_k, scores.items(), key=lambda item: item[1])
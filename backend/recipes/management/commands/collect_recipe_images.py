@@ -0,0 +1,56 @@
+import time
+from pathlib import Path
+
+from django.core.management import BaseCommand
+from django.db.models import Count
+
+from recipes.models import Recipe
+from recipes.storage import recipe_image_storage
+
+
+class Command(BaseCommand):
+    help = "Удаляет изображения, на которые не ссылается ни один рецепт"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Не трогать файлы моложе указанного числа часов",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        references = dict(
+            Recipe.all_objects.exclude(image="")
+            .order_by()
+            .values_list("image")
+            .annotate(count=Count("id"))
+        )
+        root = Path(recipe_image_storage.location)
+        deadline = time.time() - options["grace_hours"] * 60 * 60
+
+        removed = 0
+        freed = 0
+        for path in (root / "recipes").rglob("*"):
+            if not path.is_file():
+                continue
+            name = path.relative_to(root).as_posix()
+            if references.get(name):
+                continue
+            stat = path.stat()
+            if stat.st_mtime > deadline:
+                continue
+            if not options["dry_run"]:
+                path.unlink(missing_ok=True)
+            removed += 1
+            freed += stat.st_size
+
+        shared = sum(1 for count in references.values() if count > 1)
+        self.stdout.write(
+            f"Файлов в использовании: {len(references)}, "
+            f"из них общих для нескольких рецептов: {shared}"
+        )
+        self.stdout.write(
+            f"Удалено файлов: {removed}, освобождено байт: {freed}"
+        )
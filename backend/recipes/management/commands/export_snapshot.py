@@ -0,0 +1,72 @@
+import json
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from recipes.snapshot import (
+    export_table,
+    get_media_manifest,
+    get_snapshot_models,
+)
+
+
+class Command(BaseCommand):
+    help = "Выгружает пользователей, рецепты и подписки в каталог снимка"
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", type=Path)
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument(
+            "--copy-media",
+            action="store_true",
+            help="Скопировать изображения рецептов в каталог снимка",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["directory"]
+        directory.mkdir(parents=True, exist_ok=True)
+
+        tables = []
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"
+                    )
+            for model in get_snapshot_models():
+                table = model._meta.db_table
+                rows = export_table(
+                    model, directory / f"{table}.csv", options["chunk_size"]
+                )
+                tables.append(
+                    {"table": table, "file": f"{table}.csv", "rows": rows}
+                )
+                self.stdout.write(f"{table}: {rows}")
+            media = get_media_manifest()
+
+        if options["copy_media"]:
+            media_root = Path(settings.MEDIA_ROOT)
+            for item in media:
+                source = media_root / item["name"]
+                if source.is_file():
+                    target = directory / "media" / item["name"]
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(source, target)
+
+        manifest = {
+            "created_at": timezone.now().isoformat(),
+            "vendor": connection.vendor,
+            "tables": tables,
+            "media": media,
+        }
+        with open(directory / "manifest.json", "w", encoding="utf-8") as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=2)
+
+        missing = sum(1 for item in media if item["size"] is None)
+        self.stdout.write(
+            f"Изображений: {len(media)}, отсутствует на диске: {missing}"
+        )
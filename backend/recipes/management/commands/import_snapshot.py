@@ -0,0 +1,71 @@
+import json
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import transaction
+
+from recipes.snapshot import get_snapshot_models, import_table, reset_sequences
+
+
+class Command(BaseCommand):
+    help = "Загружает снимок, созданный командой export_snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", type=Path)
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument(
+            "--flush",
+            action="store_true",
+            help="Очистить базу данных перед загрузкой",
+        )
+        parser.add_argument(
+            "--copy-media",
+            action="store_true",
+            help="Скопировать изображения из снимка в MEDIA_ROOT",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["directory"]
+        try:
+            with open(directory / "manifest.json", encoding="utf-8") as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            raise CommandError(f"В {directory} нет manifest.json")
+
+        models = {
+            model._meta.db_table: model for model in get_snapshot_models()
+        }
+        if options["flush"]:
+            call_command("flush", interactive=False, verbosity=0)
+
+        with transaction.atomic():
+            for table in manifest["tables"]:
+                model = models[table["table"]]
+                rows = import_table(
+                    model, directory / table["file"], options["chunk_size"]
+                )
+                if rows != table["rows"]:
+                    raise CommandError(
+                        f"{table['table']}: загружено {rows} строк "
+                        f"из {table['rows']}"
+                    )
+                self.stdout.write(f"{table['table']}: {rows}")
+            reset_sequences(list(models.values()))
+
+        media_root = Path(settings.MEDIA_ROOT)
+        missing = 0
+        for item in manifest["media"]:
+            target = media_root / item["name"]
+            source = directory / "media" / item["name"]
+            if options["copy_media"] and source.is_file():
+                if not target.is_file():
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(source, target)
+            if not target.is_file():
+                missing += 1
+        self.stdout.write(
+            f"Изображений: {len(manifest['media'])}, "
+            f"отсутствует в MEDIA_ROOT: {missing}"
+        )
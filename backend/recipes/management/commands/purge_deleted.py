@@ -0,0 +1,66 @@
+import time
+import traceback
+
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from recipes.deletion import BatchPurger
+from recipes.models import DeletionJob
+
+
+class Command(BaseCommand):
+    help = "Удаляет из базы помеченных удалёнными пользователей и рецепты"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Обработать очередь и завершиться",
+        )
+        parser.add_argument("--interval", type=float, default=5)
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Вернуть в очередь задачи, завершившиеся ошибкой",
+        )
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            DeletionJob.objects.filter(status=DeletionJob.FAILED).update(
+                status=DeletionJob.PENDING, error=""
+            )
+        while True:
+            job = self.claim()
+            if job is not None:
+                self.process(job, options["batch_size"])
+                continue
+            if options["once"]:
+                return
+            connection.close()
+            time.sleep(options["interval"])
+
+    def claim(self):
+        with transaction.atomic():
+            jobs = DeletionJob.objects.filter(status=DeletionJob.PENDING)
+            if connection.features.has_select_for_update_skip_locked:
+                jobs = jobs.select_for_update(skip_locked=True)
+            job = jobs.order_by("id").first()
+            if job is not None:
+                job.status = DeletionJob.RUNNING
+                job.save(update_fields=["status"])
+        return job
+
+    def process(self, job, batch_size):
+        try:
+            BatchPurger(job, batch_size).run()
+        except Exception:
+            job.status = DeletionJob.FAILED
+            job.error = traceback.format_exc()
+            self.stderr.write(f"{job}: {job.error}")
+        else:
+            job.status = DeletionJob.DONE
+            self.stdout.write(f"{job}: удалено")
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at"])
@@ -0,0 +1,55 @@
+from collections import defaultdict
+
+from django.core.management import BaseCommand
+from django.db.models import Count, Max
+from django.db.models.functions import TruncHour
+
+from recipes.models import Favorite, RecipeActivity, ShoppingCart
+
+
+class Command(BaseCommand):
+    help = "Сворачивает добавления в избранное и корзину в почасовую таблицу"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Пересчитать всю историю, а не только последние часы",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        since = None
+        if not options["full"]:
+            since = RecipeActivity.objects.aggregate(since=Max("hour"))[
+                "since"
+            ]
+
+        counters = defaultdict(dict)
+        for model, field in (
+            (Favorite, "favorites"),
+            (ShoppingCart, "shopping_cart"),
+        ):
+            rows = model.objects.all()
+            if since is not None:
+                rows = rows.filter(created_at__gte=since)
+            rows = (
+                rows.order_by()
+                .annotate(hour=TruncHour("created_at"))
+                .values("recipe_id", "hour")
+                .annotate(count=Count("id"))
+            )
+            for row in rows.iterator():
+                counters[row["recipe_id"], row["hour"]][field] = row["count"]
+
+        RecipeActivity.objects.bulk_create(
+            [
+                RecipeActivity(recipe_id=recipe_id, hour=hour, **counts)
+                for (recipe_id, hour), counts in counters.items()
+            ],
+            batch_size=options["batch_size"],
+            update_conflicts=True,
+            unique_fields=["recipe", "hour"],
+            update_fields=["favorites", "shopping_cart"],
+        )
+        self.stdout.write(f"Обновлено часовых записей: {len(counters)}")
@@ -0,0 +1,170 @@
+import io
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management import BaseCommand, call_command
+from django.db import transaction
+from PIL import Image
+
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientInRecipe,
+    Recipe,
+    ShoppingCart,
+    Tag,
+)
+from recipes.storage import recipe_image_storage
+from users.models import Following, User
+
+
+class Command(BaseCommand):
+    help = "Заполняет базу случайными данными для нагрузочных проверок"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--recipes", type=int, default=10000)
+        parser.add_argument("--tags", type=int, default=10)
+        parser.add_argument("--ingredients", type=int, default=2000)
+        parser.add_argument("--follows", type=int, default=20)
+        parser.add_argument("--favorites", type=int, default=30)
+        parser.add_argument("--cart", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+
+        users = self.create_users(options["users"])
+        tags = self.create_tags(options["tags"])
+        ingredients = self.create_ingredients(options["ingredients"])
+        recipes = self.create_recipes(
+            options["recipes"], users, tags, ingredients
+        )
+        self.create_pairs(
+            Following,
+            "follower",
+            "following",
+            users,
+            users,
+            options["follows"],
+        )
+        self.create_pairs(
+            Favorite, "user", "recipe", users, recipes, options["favorites"]
+        )
+        self.create_pairs(
+            ShoppingCart, "user", "recipe", users, recipes, options["cart"]
+        )
+        call_command("reconcile_user_counters", stdout=self.stdout)
+        self.stdout.write(
+            f"Создано пользователей: {len(users)}, рецептов: {len(recipes)}"
+        )
+
+    def create_users(self, count):
+        start = User.objects.count()
+        password = make_password("seed-password")
+        return User.objects.bulk_create(
+            [
+                User(
+                    username=f"seed{number}",
+                    email=f"seed{number}@example.com",
+                    first_name=f"Имя{number}",
+                    last_name=f"Фамилия{number}",
+                    password=password,
+                )
+                for number in range(start, start + count)
+            ],
+            batch_size=self.batch_size,
+        )
+
+    def create_tags(self, count):
+        tags = list(Tag.objects.all())
+        start = len(tags)
+        tags += Tag.objects.bulk_create(
+            [
+                Tag(
+                    name=f"Тег {number}",
+                    color=f"#{number:06X}",
+                    slug=f"seed-{number}",
+                )
+                for number in range(start, count)
+            ]
+        )
+        return tags
+
+    def create_ingredients(self, count):
+        ingredients = list(Ingredient.objects.all())
+        start = len(ingredients)
+        ingredients += Ingredient.objects.bulk_create(
+            [
+                Ingredient(
+                    name=f"ингредиент {number}",
+                    measurement_unit=self.random.choice(("г", "мл", "шт")),
+                )
+                for number in range(start, count)
+            ],
+            batch_size=self.batch_size,
+        )
+        return ingredients
+
+    def create_recipes(self, count, users, tags, ingredients):
+        image = self.save_image()
+        recipes = Recipe.objects.bulk_create(
+            [
+                Recipe(
+                    name=f"Рецепт {number}",
+                    author=self.random.choice(users),
+                    cooking_time=self.random.randint(1, 180),
+                    text="Описание рецепта",
+                    image=image,
+                )
+                for number in range(count)
+            ],
+            batch_size=self.batch_size,
+        )
+        Recipe.tags.through.objects.bulk_create(
+            [
+                Recipe.tags.through(recipe=recipe, tag=tag)
+                for recipe in recipes
+                for tag in self.random.sample(tags, min(2, len(tags)))
+            ],
+            batch_size=self.batch_size,
+        )
+        IngredientInRecipe.objects.bulk_create(
+            [
+                IngredientInRecipe(
+                    recipe=recipe,
+                    ingredient=ingredient,
+                    amount=self.random.randint(1, 500),
+                )
+                for recipe in recipes
+                for ingredient in self.random.sample(
+                    ingredients,
+                    min(self.random.randint(3, 12), len(ingredients)),
+                )
+            ],
+            batch_size=self.batch_size,
+        )
+        return recipes
+
+    def create_pairs(self, model, left, right, owners, targets, per_owner):
+        objects = []
+        for owner in owners:
+            for target in self.random.sample(
+                targets, min(per_owner, len(targets))
+            ):
+                if target is not owner:
+                    objects.append(model(**{left: owner, right: target}))
+        model.objects.bulk_create(
+            objects, batch_size=self.batch_size, ignore_conflicts=True
+        )
+
+    def save_image(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (16, 16), "orange").save(buffer, "PNG")
+        return recipe_image_storage.save(
+            "recipes/seed.png", ContentFile(buffer.getvalue())
+        )
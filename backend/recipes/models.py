@@ -3,6 +3,8 @@ from django.core.validators import MinValueValidator, RegexValidator
 from django.db import models
 from django.db.models.constraints import UniqueConstraint
 
+from .storage import recipe_image_storage
+
 User = get_user_model()
 
 
@@ -42,6 +44,11 @@ class Ingredient(models.Model):
         return f"{self.name}, {self.measurement_unit}"
 
 
+class AliveManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at=None)
+
+
 class Recipe(models.Model):
     name = models.CharField("Название рецепта", max_length=200)
     author = models.ForeignKey(
@@ -60,24 +67,74 @@ class Recipe(models.Model):
     cooking_time = models.PositiveSmallIntegerField(
         "Время приготовления",
         validators=[MinValueValidator(1, message="Минимальное значение 1!")],
+        db_index=True,
     )
     tags = models.ManyToManyField(
         Tag,
         related_name="recipe",
         verbose_name="Теги рецепта",
     )
-    image = models.ImageField("Изображение", upload_to="recipes/")
+    image = models.ImageField(
+        "Изображение", upload_to="recipes/", storage=recipe_image_storage
+    )
     text = models.TextField("Описание рецепта")
+    views = models.PositiveIntegerField("Просмотры", default=0)
+    created_at = models.DateTimeField("Дата публикации", auto_now_add=True)
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
+    deleted_at = models.DateTimeField(
+        "Дата удаления", null=True, blank=True, db_index=True
+    )
+
+    objects = AliveManager()
+    all_objects = models.Manager()
 
     class Meta:
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
         ordering = ["-id"]
+        indexes = [
+            models.Index(fields=["author", "-id"], name="recipe_author_id_idx")
+        ]
 
     def __str__(self):
         return self.name
 
 
+class RecipeNeighbour(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="neighbours",
+        verbose_name="Рецепт",
+    )
+    neighbour = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Похожий рецепт",
+    )
+    score = models.FloatField("Сходство")
+    computed_at = models.DateTimeField("Дата расчёта")
+
+    class Meta:
+        verbose_name = "Похожий рецепт"
+        verbose_name_plural = "Похожие рецепты"
+        ordering = ["recipe", "-score"]
+        constraints = [
+            UniqueConstraint(
+                fields=["recipe", "neighbour"], name="unique_recipe_neighbour"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["recipe", "-score"], name="recipe_neighbour_score_idx"
+            )
+        ]
+
+    def __str__(self):
+        return f'"{self.neighbour}" похож на "{self.recipe}"'
+
+
 class IngredientInRecipe(models.Model):
     ingredient = models.ForeignKey(
         Ingredient,
@@ -98,6 +155,12 @@ class IngredientInRecipe(models.Model):
     class Meta:
         verbose_name = "Ингредиент рецепта"
         verbose_name_plural = "Ингредиенты рецепта"
+        indexes = [
+            models.Index(
+                fields=["recipe", "ingredient"],
+                name="ingredient_in_recipe_idx",
+            )
+        ]
 
     def __str__(self):
         return (
@@ -119,6 +182,9 @@ class Favorite(models.Model):
         related_name="favorites",
         verbose_name="Рецепт",
     )
+    created_at = models.DateTimeField(
+        "Дата добавления", auto_now_add=True, db_index=True
+    )
 
     class Meta:
         verbose_name = "Избранное"
@@ -146,6 +212,9 @@ class ShoppingCart(models.Model):
         related_name="shopping_cart",
         verbose_name="Рецепт",
     )
+    created_at = models.DateTimeField(
+        "Дата добавления", auto_now_add=True, db_index=True
+    )
 
     class Meta:
         verbose_name = "Корзина покупок"
@@ -158,3 +227,78 @@ class ShoppingCart(models.Model):
 
     def __str__(self):
         return f'{self.user} добавил "{self.recipe}" в Корзину покупок'
+
+
+class RecipeActivity(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="activity",
+        verbose_name="Рецепт",
+    )
+    hour = models.DateTimeField("Час")
+    favorites = models.PositiveIntegerField(
+        "Добавлений в избранное", default=0
+    )
+    shopping_cart = models.PositiveIntegerField(
+        "Добавлений в корзину", default=0
+    )
+
+    class Meta:
+        verbose_name = "Активность по рецепту"
+        verbose_name_plural = "Активность по рецептам"
+        ordering = ["-hour"]
+        constraints = [
+            UniqueConstraint(
+                fields=["recipe", "hour"], name="unique_recipe_activity_hour"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["hour"], name="recipe_activity_hour_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.recipe} за {self.hour:%Y-%m-%d %H:00}"
+
+
+class DeletionJob(models.Model):
+    RECIPE = "recipe"
+    USER = "user"
+    KINDS = ((RECIPE, "Рецепт"), (USER, "Пользователь"))
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Завершена"),
+        (FAILED, "Ошибка"),
+    )
+
+    kind = models.CharField("Объект", max_length=10, choices=KINDS)
+    object_id = models.PositiveBigIntegerField("ID объекта")
+    name = models.CharField("Название", max_length=254, blank=True)
+    status = models.CharField(
+        "Статус",
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        db_index=True,
+    )
+    stage = models.CharField("Текущая таблица", max_length=100, blank=True)
+    deleted_rows = models.PositiveBigIntegerField("Удалено строк", default=0)
+    error = models.TextField("Ошибка", blank=True)
+    created_at = models.DateTimeField("Дата создания", auto_now_add=True)
+    finished_at = models.DateTimeField(
+        "Дата завершения", null=True, blank=True
+    )
+
+    class Meta:
+        verbose_name = "Задача удаления"
+        verbose_name_plural = "Задачи удаления"
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.object_id}"
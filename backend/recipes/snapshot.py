@@ -0,0 +1,145 @@
+import csv
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import connection
+
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientInRecipe,
+    Recipe,
+    ShoppingCart,
+    Tag,
+)
+from users.models import Following, User
+
+NULL = r"\N"
+COPY_OPTIONS = "FORMAT csv, HEADER true, NULL '\\N'"
+
+
+def get_snapshot_models():
+    return [
+        User,
+        Following,
+        Tag,
+        Ingredient,
+        Recipe,
+        Recipe.tags.through,
+        IngredientInRecipe,
+        Favorite,
+        ShoppingCart,
+    ]
+
+
+def get_table_sql(model):
+    columns = ", ".join(
+        connection.ops.quote_name(field.column)
+        for field in model._meta.concrete_fields
+    )
+    return f"{connection.ops.quote_name(model._meta.db_table)} ({columns})"
+
+
+def export_table(model, path, chunk_size):
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {get_table_sql(model)} TO STDOUT "
+                    f"WITH ({COPY_OPTIONS})",
+                    file,
+                )
+                return cursor.rowcount
+
+        fields = model._meta.concrete_fields
+        writer = csv.writer(file)
+        writer.writerow([field.column for field in fields])
+        rows = model._base_manager.order_by("pk").values_list(
+            *[field.attname for field in fields]
+        )
+        count = 0
+        for row in rows.iterator(chunk_size=chunk_size):
+            writer.writerow([format_value(value) for value in row])
+            count += 1
+        return count
+
+
+def format_value(value):
+    if value is None:
+        return NULL
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+
+def import_table(model, path, chunk_size):
+    with open(path, encoding="utf-8", newline="") as file:
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {get_table_sql(model)} FROM STDIN "
+                    f"WITH ({COPY_OPTIONS})",
+                    file,
+                )
+                return cursor.rowcount
+
+        reader = csv.reader(file)
+        columns = next(reader)
+        fields = {field.column: field for field in model._meta.concrete_fields}
+        fields = [fields[column] for column in columns]
+        placeholders = ", ".join(["%s"] * len(fields))
+        sql = f"INSERT INTO {get_table_sql(model)} VALUES ({placeholders})"
+
+        count = 0
+        chunk = []
+        with connection.cursor() as cursor:
+            for row in reader:
+                chunk.append(
+                    [
+                        None
+                        if value == NULL
+                        else field.get_db_prep_save(
+                            field.to_python(value), connection
+                        )
+                        for field, value in zip(fields, row)
+                    ]
+                )
+                if len(chunk) >= chunk_size:
+                    cursor.executemany(sql, chunk)
+                    count += len(chunk)
+                    chunk = []
+            if chunk:
+                cursor.executemany(sql, chunk)
+                count += len(chunk)
+        return count
+
+
+def reset_sequences(models):
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def get_media_manifest():
+    media_root = Path(settings.MEDIA_ROOT)
+    manifest = []
+    images = (
+        Recipe._base_manager.exclude(image="")
+        .order_by()
+        .values_list("image", flat=True)
+        .distinct()
+    )
+    for name in images.iterator():
+        path = media_root / name
+        manifest.append(
+            {
+                "name": name,
+                "size": path.stat().st_size if path.is_file() else None,
+            }
+        )
+    return manifest
@@ -1,10 +1,12 @@
 from django.contrib import admin
 
 from .models import Following, User
+from recipes.admin import SoftDeleteAdminMixin
+from recipes.deletion import soft_delete_user
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     list_display = (
         "id",
         "username",
@@ -20,6 +22,7 @@ class UserAdmin(admin.ModelAdmin):
         "username",
         "email",
     )
+    soft_delete = staticmethod(soft_delete_user)
 
 
 @admin.register(Following)
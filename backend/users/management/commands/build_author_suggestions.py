@@ -0,0 +1,67 @@
+from collections import Counter, defaultdict
+from heapq import nlargest
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import AuthorSuggestion, Following
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает рекомендации авторов по графу подписок"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top-k", type=int, default=settings.AUTHOR_SUGGESTIONS_TOP_K
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        computed_at = timezone.now()
+        following = defaultdict(set)
+        rows = Following.objects.order_by().values_list(
+            "follower_id", "following_id"
+        )
+        for follower_id, following_id in rows.iterator():
+            following[follower_id].add(following_id)
+
+        users = sorted(following)
+        batch_size = options["batch_size"]
+        for start in range(0, len(users), batch_size):
+            batch = users[start:start + batch_size]
+            suggestions = [
+                AuthorSuggestion(
+                    user_id=user_id,
+                    author_id=author_id,
+                    score=score,
+                    computed_at=computed_at,
+                )
+                for user_id in batch
+                for author_id, score in self.get_suggestions(
+                    user_id, following, options["top_k"]
+                )
+            ]
+            with transaction.atomic():
+                AuthorSuggestion.objects.filter(user_id__in=batch).delete()
+                AuthorSuggestion.objects.bulk_create(suggestions)
+
+        stale = AuthorSuggestion.objects.filter(
+            computed_at__lt=computed_at
+        ).delete()[0]
+        self.stdout.write(
+            f"Пересчитано пользователей: {len(users)}, "
+            f"удалено устаревших рекомендаций: {stale}"
+        )
+
+    def get_suggestions(self, user_id, following, top_k):
+        followed = following[user_id]
+        scores = Counter()
+        for author_id in followed:
+            scores.update(following.get(author_id, ()))
+        for author_id in followed | {user_id}:
+            scores.pop(author_id, None)
+        return nlargest(
+            top_k, scores.items(), key=lambda item: (item[1], -item[0])
+        )
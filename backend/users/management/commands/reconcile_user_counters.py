@@ -0,0 +1,40 @@
+from django.core.management import BaseCommand
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import Recipe
+from users.models import Following, User
+
+
+def count_by(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("id"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = "Сверяет счётчики рецептов и подписок пользователей с данными"
+
+    def handle(self, *args, **options):
+        actual = {
+            "recipes_count": count_by(Recipe, "author"),
+            "followers_count": count_by(Following, "following"),
+            "following_count": count_by(Following, "follower"),
+        }
+        stale = User.objects.annotate(
+            **{f"actual_{name}": value for name, value in actual.items()}
+        ).filter(
+            ~Q(recipes_count=F("actual_recipes_count"))
+            | ~Q(followers_count=F("actual_followers_count"))
+            | ~Q(following_count=F("actual_following_count"))
+        )
+        user_ids = list(stale.values_list("id", flat=True))
+        User.objects.filter(id__in=user_ids).update(**actual)
+        self.stdout.write(f"Исправлено пользователей: {len(user_ids)}")
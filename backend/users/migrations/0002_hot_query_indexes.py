@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 08:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='following',
+            index=models.Index(fields=['following', 'follower'], name='following_author_idx'),
+        ),
+    ]
@@ -1,8 +1,13 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
 from django.db.models import UniqueConstraint
 
 
+class AliveUserManager(UserManager):
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at=None)
+
+
 class User(AbstractUser):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = [
@@ -22,6 +27,21 @@ class User(AbstractUser):
         max_length=254,
         unique=True,
     )
+    recipes_count = models.PositiveIntegerField(
+        "Количество рецептов", default=0, db_index=True
+    )
+    followers_count = models.PositiveIntegerField(
+        "Количество подписчиков", default=0, db_index=True
+    )
+    following_count = models.PositiveIntegerField(
+        "Количество подписок", default=0, db_index=True
+    )
+    deleted_at = models.DateTimeField(
+        "Дата удаления", null=True, blank=True, db_index=True
+    )
+
+    objects = AliveUserManager()
+    all_objects = UserManager()
 
     class Meta:
         ordering = ["id"]
@@ -53,5 +73,45 @@ class Following(models.Model):
                 fields=["follower", "following"], name="unique_following"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["following", "follower"], name="following_author_idx"
+            )
+        ]
         verbose_name = "Подписка"
         verbose_name_plural = "Подписки"
+
+
+class AuthorSuggestion(models.Model):
+    user = models.ForeignKey(
+        User,
+        related_name="author_suggestions",
+        verbose_name="Пользователь",
+        on_delete=models.CASCADE,
+    )
+    author = models.ForeignKey(
+        User,
+        related_name="suggested_to",
+        verbose_name="Автор",
+        on_delete=models.CASCADE,
+    )
+    score = models.PositiveIntegerField("Общих подписок")
+    computed_at = models.DateTimeField("Дата расчёта")
+
+    class Meta:
+        ordering = ["user", "-score"]
+        constraints = [
+            UniqueConstraint(
+                fields=["user", "author"], name="unique_author_suggestion"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-score"], name="author_suggestion_score_idx"
+            )
+        ]
+        verbose_name = "Рекомендованный автор"
+        verbose_name_plural = "Рекомендованные авторы"
+
+    def __str__(self):
+        return f"{self.author} для {self.user}"